@@ -1,32 +1,187 @@
-from flask import Flask, render_template, request, send_file
+from flask import Flask, Request, Response, render_template, request, send_file, jsonify, redirect, url_for, abort, g
+import io
 import os
+import json
+import zlib
+import zipfile
+import mimetypes
+import shutil
 import spacy
-import pdfplumber
 import pytesseract
 import pandas as pd
 from docx import Document
 from PIL import Image
 from fpdf import FPDF
 import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from src.logger import logging
+from src.components.hybrid_extraction import HybridTextExtractor
+from src.components.ocr_backend import get_backend
+from src.components.ocr_cache import OCRCache
+from src.components.result_cache import ResultCache
+from src.components.job_queue import JobQueue, QueueFullError, QUEUED, RUNNING, DONE, FAILED
+from src.components.metrics import MetricsRegistry, PhaseTimer
+from src.components.chunked_ner import chunked_entities, iter_document_entities
+from src.constants import OCR_CACHE_DIR, RESULT_CACHE_DIR
+from src.entity.config_entity import (
+    OCRCacheConfig, JobQueueConfig, NERChunkingConfig, HybridExtractionConfig, OCRPreprocessConfig
+)
 
 # ✅ Tesseract OCR Path
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
+# ✅ Metrics on /metrics; gunicorn workers publish snapshots to SMARTDOC_METRICS_DIR so any worker reports them all
+metrics = MetricsRegistry(os.environ.get("SMARTDOC_METRICS_DIR") or None)
+PHASE_SECONDS = metrics.histogram(
+    "smartdoc_phase_seconds", "Time spent in each document processing phase", ("phase", "doc_type", "size", "pages")
+)
+PHASES_IN_FLIGHT = metrics.gauge("smartdoc_phase_in_flight", "Documents currently in each processing phase", ("phase",))
+DOCUMENTS = metrics.counter("smartdoc_documents_total", "Documents processed, by outcome", ("doc_type", "outcome"))
+UPLOAD_BYTES = metrics.histogram(
+    "smartdoc_upload_bytes", "Size of processed uploads", ("doc_type",),
+    buckets=(10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024, 50 * 1024 * 1024)
+)
+DOCUMENT_PAGES = metrics.histogram(
+    "smartdoc_document_pages", "Pages per PDF or image", ("doc_type",), buckets=(1, 2, 5, 10, 20, 50, 100, 500)
+)
+HTTP_SECONDS = metrics.histogram("smartdoc_http_request_seconds", "HTTP request latency", ("endpoint", "method", "status"))
+HTTP_IN_FLIGHT = metrics.gauge("smartdoc_http_requests_in_flight", "HTTP requests being served")
+JOBS = metrics.gauge("smartdoc_jobs", "Extraction jobs held by the queue, by state", ("state",))
+
+DOC_TYPES = {
+    "text/plain": "text",
+    "application/pdf": "pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+    "text/csv": "csv",
+}
+SIZE_CLASSES = ((100 * 1024, "<100KB"), (1024 * 1024, "100KB-1MB"), (10 * 1024 * 1024, "1-10MB"))
+PAGE_CLASSES = ((1, "1"), (5, "2-5"), (20, "6-20"))
+
+
+def doc_type(mime_type):
+    return DOC_TYPES.get(mime_type) or ("image" if mime_type and "image" in mime_type else "other")
+
+
+def document_labels(mime_type, size, pages):
+    """Low-cardinality labels for a document: its type plus size and page-count classes."""
+    size_label = next((label for bound, label in SIZE_CLASSES if size < bound), ">10MB")
+    pages_label = next((label for bound, label in PAGE_CLASSES if pages <= bound), ">20") if pages else "n/a"
+    return {"doc_type": doc_type(mime_type), "size": size_label, "pages": pages_label}
+
+
+def new_timer():
+    return PhaseTimer(PHASE_SECONDS, PHASES_IN_FLIGHT)
+
+
+def record_document(timer, document, outcome):
+    labels = document_labels(**document)
+    timer.observe(**labels)
+    UPLOAD_BYTES.observe(document["size"], doc_type=labels["doc_type"])
+    if document["pages"]:
+        DOCUMENT_PAGES.observe(document["pages"], doc_type=labels["doc_type"])
+    DOCUMENTS.inc(doc_type=labels["doc_type"], outcome=outcome)
+    return labels
+
+
+# ✅ Uploads: spooled to disk above UPLOAD_SPOOL_BYTES while the request is parsed, refused with a 413 above MAX_UPLOAD_BYTES
+MAX_UPLOAD_BYTES = int(os.environ.get("SMARTDOC_MAX_UPLOAD_MB", "50")) * 1024 * 1024
+UPLOAD_SPOOL_BYTES = int(os.environ.get("SMARTDOC_UPLOAD_SPOOL_KB", "512")) * 1024
+UPLOAD_DIR = os.environ.get("SMARTDOC_UPLOAD_DIR") or None  # None: the system temp dir
+UPLOAD_COPY_CHUNK = 1024 * 1024
+
+
+class SpooledRequest(Request):
+    upload_seconds = 0.0
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES, dir=UPLOAD_DIR)
+
+    def _load_form_data(self):
+        # Reading and parsing the request body: the "upload" phase.
+        start = time.perf_counter()
+        with PHASES_IN_FLIGHT.track_inprogress(phase="upload"):
+            super()._load_form_data()
+        self.upload_seconds = time.perf_counter() - start
+
+
 # ✅ Flask App
 app = Flask(__name__, static_folder="static", template_folder="templates")
+app.request_class = SpooledRequest
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_BYTES
 
 # ✅ Load spaCy NER Model
-nlp = spacy.load("trained_invoice_ner")
+MODEL_DIR = "trained_invoice_ner"
+nlp = spacy.load(MODEL_DIR)
+
+# ✅ Long documents go through NER in overlapping chunks (gunicorn workers already parallelise requests)
+ner_chunking = NERChunkingConfig()
+
+
+def entity_records(content, entities):
+    return [{"text": content[start:end].strip(), "label": label} for start, end, label in entities]
+
+# ✅ Text-layer-first PDF reader (OCR only for scanned pages, preprocessed and at adaptive DPI)
+# SMARTDOC_OCR_BACKEND=auto uses a pool of persistent Tesseract engines when tesserocr is installed.
+OCR_BACKEND = os.environ.get("SMARTDOC_OCR_BACKEND", "auto")
+OCR_ENGINES = int(os.environ.get("SMARTDOC_OCR_ENGINES", "2"))
+hybrid_extractor = HybridTextExtractor(
+    HybridExtractionConfig(preprocess=OCRPreprocessConfig()),
+    get_backend(OCR_BACKEND, OCR_ENGINES)
+)
+
+# ✅ OCR result cache (keyed by upload content + OCR parameters)
+ocr_cache = OCRCache(OCRCacheConfig(cache_dir=str(OCR_CACHE_DIR)))
+
+# ✅ Extraction result cache (keyed by upload content + model version); SMARTDOC_RESULT_CACHE_DIR="" keeps it in memory
+result_cache = ResultCache(
+    OCRCacheConfig(cache_dir=os.environ.get("SMARTDOC_RESULT_CACHE_DIR", str(RESULT_CACHE_DIR)) or None, memory_items=256),
+    model_dir=MODEL_DIR
+)
+
+
+def cached_ocr(file, kind, extract):
+    key = ocr_cache.make_key(file, kind=kind, engine=hybrid_extractor.backend.version, **asdict(hybrid_extractor.config))
+    pages = ocr_cache.get(key)
+    if pages is None:
+        pages = extract()
+        ocr_cache.put(key, pages)
+    return pages
 
 # ✅ PDF Class
+FONT_DIR = "fonts"
+
+# Parsed font metrics per (family, style), captured from the first add_font so later reports skip the .pkl/TTF load.
+_font_cache = {}
+
+
 class PDF(FPDF):
     def __init__(self):
         super().__init__()
-        font_dir = os.path.join("fonts")
-        self.add_font("DejaVu", "", os.path.join(font_dir, "DejaVuSans.ttf"), uni=True)
-        self.add_font("DejaVu", "B", os.path.join(font_dir, "DejaVuSans-Bold.ttf"), uni=True)
+        self.add_cached_font("DejaVu", "", "DejaVuSans.ttf")
+        self.add_cached_font("DejaVu", "B", "DejaVuSans-Bold.ttf")
         self.set_font("DejaVu", "", 12)
 
+    def add_cached_font(self, family, style, filename):
+        path = os.path.join(FONT_DIR, filename)
+        fontkey = family.lower() + style.upper()
+        cached = _font_cache.get((family, style))
+        if cached is None:
+            self.add_font(family, style, path, uni=True)
+            # Copy before any text is written: FPDF records used glyphs in the font's "subset" list.
+            _font_cache[(family, style)] = (
+                dict(self.fonts[fontkey], subset=list(self.fonts[fontkey]["subset"])),
+                {key: dict(self.font_files[key]) for key in (fontkey, path)},
+            )
+            return
+
+        font, font_files = cached
+        self.fonts[fontkey] = dict(font, i=len(self.fonts) + 1, subset=list(font["subset"]))
+        for key, entry in font_files.items():
+            self.font_files[key] = dict(entry)
+
     def header(self):
         self.set_font("DejaVu", "B", 14)
         self.cell(0, 10, "SmartDoc Extracted Report", ln=True, align="C")
@@ -41,33 +196,74 @@ def home():
 def extractor():
     return render_template("app.html")
 
-@app.route('/extract', methods=["POST"])
-def extract():
-    file = request.files['file']
-    content = ""
-    mime_type = file.content_type
+class UploadTooLarge(ValueError):
+    pass
+
+
+def save_upload(stream, limit=None):
+    """
+    Copy an upload stream to a private file on disk and return its path; the caller deletes it.
+
+    With a limit, the copy stops with UploadTooLarge as soon as more than limit bytes were read.
+    """
+    fd, path = tempfile.mkstemp(prefix="smartdoc-upload-", dir=UPLOAD_DIR)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            if limit is None:
+                shutil.copyfileobj(stream, out, UPLOAD_COPY_CHUNK)
+            else:
+                copied = 0
+                while chunk := stream.read(UPLOAD_COPY_CHUNK):
+                    copied += len(chunk)
+                    if copied > limit:
+                        raise UploadTooLarge(f"larger than the {limit} byte upload limit")
+                    out.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def ocr_image_file(path):
+    with Image.open(path) as image:
+        return [hybrid_extractor.ocr_image(image)]
+
+
+def extract_content(path, mime_type, timer):
+    """
+    (text, page count) of an upload on disk; the page count is None for formats without pages.
+
+    Parsers read the file by path, so only the page being processed is held in memory.
+    PDFs and images are timed as the "ocr" phase, every other format as "parse".
+    """
+    kind = doc_type(mime_type)
 
     # ✅ Extract content
-    if mime_type == "text/plain":
-        content = file.read().decode("utf-8")
-    elif mime_type == "application/pdf":
-        with pdfplumber.open(file) as pdf:
-            content = "\n".join(page.extract_text() or "" for page in pdf.pages)
-    elif mime_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        doc = Document(file)
-        content = "\n".join([p.text for p in doc.paragraphs])
-    elif mime_type == "text/csv":
-        df = pd.read_csv(file)
-        content = df.to_string()
-    elif "image" in mime_type:
-        image = Image.open(file)
-        content = pytesseract.image_to_string(image)
-
-    # ✅ NER
-    doc_nlp = nlp(content)
-    entities = [{"text": ent.text.strip(), "label": ent.label_} for ent in doc_nlp.ents]
-
-    # ✅ Generate PDF
+    if kind == "pdf":
+        with timer.phase("ocr"):
+            pages = cached_ocr(path, "pdf", lambda: hybrid_extractor.extract_pdf(path))
+        return "\n".join(pages), len(pages)
+    if kind == "image":
+        with timer.phase("ocr"):
+            pages = cached_ocr(path, "image", lambda: ocr_image_file(path))
+        return "\n".join(pages), 1
+
+    content = ""
+    with timer.phase("parse"):
+        if kind == "text":
+            with open(path, encoding="utf-8", newline="") as f:
+                content = f.read()
+        elif kind == "docx":
+            doc = Document(path)
+            content = "\n".join([p.text for p in doc.paragraphs])
+        elif kind == "csv":
+            df = pd.read_csv(path, memory_map=True)
+            content = df.to_string()
+    return content, None
+
+
+def render_report(content, entities):
+    """The downloadable summary as PDF bytes, built entirely in memory."""
     pdf = PDF()
     pdf.add_page()
 
@@ -101,17 +297,400 @@ def extract():
         pdf.set_font("DejaVu", "", 11)
         pdf.cell(0, 8, "No named entities found.", ln=True)
 
-    # ✅ Save PDF
-    temp_pdf_path = os.path.join(tempfile.gettempdir(), "output.pdf")
-    pdf.output(temp_pdf_path)
+    # FPDF 1.7 builds the document as a latin-1 str.
+    return pdf.output(dest="S").encode("latin1")
+
+
+def process_document(path, mime_type, timer):
+    """
+    Text and entities for one upload; runs on a job_queue worker. The PDF report is only built if downloaded.
+
+    The job owns the spooled upload at `path` and deletes it once the text is extracted.
+    """
+    try:
+        try:
+            size = os.path.getsize(path)
+            key = result_cache.make_key(
+                path, mime_type=mime_type, engine=hybrid_extractor.backend.version,
+                **asdict(hybrid_extractor.config), **asdict(ner_chunking)
+            )
+            result = result_cache.get(key)
+            if result is not None:
+                record_document(timer, result.get("document") or dict(mime_type=mime_type, size=size, pages=None), "cached")
+                return result
+
+            content, pages = extract_content(path, mime_type, timer)
+        finally:
+            os.remove(path)
+
+        # ✅ NER
+        with timer.phase("ner"):
+            entities = entity_records(content, chunked_entities(nlp, content, ner_chunking))
+    except Exception:
+        DOCUMENTS.inc(doc_type=doc_type(mime_type), outcome="failed")
+        raise
+
+    document = {"mime_type": mime_type, "size": size, "pages": pages}
+    record_document(timer, document, "done")
+    result = {"text": content, "entities": entities, "document": document}
+    result_cache.put(key, result)
+    return result
+
+
+# ✅ Rendered reports, most recently downloaded last
+REPORT_CACHE_ITEMS = 32
+report_cache = OrderedDict()
+report_cache_lock = threading.Lock()
+
+
+def get_report(job):
+    with report_cache_lock:
+        if job.id in report_cache:
+            report_cache.move_to_end(job.id)
+            return report_cache[job.id]
+
+    document = job.result.get("document") or {"mime_type": None, "size": 0, "pages": None}
+    timer = new_timer()
+    with timer.phase("render"):
+        report = render_report(job.result["text"], job.result["entities"])
+    timer.observe(**document_labels(**document))
+    with report_cache_lock:
+        report_cache[job.id] = report
+        while len(report_cache) > REPORT_CACHE_ITEMS:
+            report_cache.popitem(last=False)
+    return report
+
+
+def forget_report(job):
+    with report_cache_lock:
+        report_cache.pop(job.id, None)
+
+
+# ✅ Bounded background workers for OCR + NER, with job state shared by every worker process
+SYNC_WAIT_SECONDS = 30
+JOB_STORE = os.environ.get("SMARTDOC_JOB_DB", os.path.join(tempfile.gettempdir(), "smartdoc_jobs.sqlite"))
+job_queue = JobQueue(JobQueueConfig(store_path=JOB_STORE), on_expire=forget_report)
+
+
+def collect_job_stats():
+    stats = job_queue.stats()
+    for state in (QUEUED, RUNNING, DONE, FAILED):
+        JOBS.set(stats[state], state=state)
+
+
+metrics.add_collector(collect_job_stats)
+
+
+# ✅ Warmup: every serving process runs NER and report rendering once before /health reports it ready
+ready = threading.Event()
+
+
+def warmup():
+    sample = "Invoice Number: INV-0001\nBill To: Example Traders\nTotal Amount: 1,000.00"
+    entities = entity_records(sample, chunked_entities(nlp, sample, ner_chunking))
+    render_report(sample, entities)
+
+
+def run_warmup():
+    try:
+        warmup()
+    except Exception:
+        logging.error("❌ Warmup failed, staying unready", exc_info=True)
+        return
+    ready.set()
+    logging.info("🔥 Warmup done, ready to serve")
+
+
+def start_warmup():
+    """Warm up in the background; gunicorn calls this in each worker after the fork (post_fork)."""
+    threading.Thread(target=run_warmup, name="smartdoc-warmup", daemon=True).start()
+
+
+def submit_upload(file):
+    timer = new_timer()
+    timer.record("upload", request.upload_seconds)
+    # The upload stream is gone once the request ends, so the worker gets its own copy on disk.
+    with timer.phase("write"):
+        path = save_upload(file.stream)
+    try:
+        return job_queue.submit(process_document, path, file.content_type, timer)
+    except QueueFullError:
+        os.remove(path)
+        raise
+
+
+# ✅ Batch extraction: runs on the request thread, so its size and concurrency are capped
+BATCH_NER_SIZE = 8
+ZIP_TYPES = {"application/zip", "application/x-zip-compressed"}
+MAX_BATCH_DOCUMENTS = int(os.environ.get("SMARTDOC_MAX_BATCH_DOCUMENTS", "20"))
+batch_slots = threading.BoundedSemaphore(int(os.environ.get("SMARTDOC_MAX_BATCHES", "1")))
+
+
+def spool_uploads(files):
+    """Copy uploads to private files on disk; Flask closes request.files before a streamed response is read."""
+    spooled = []
+    try:
+        for file in files:
+            spooled.append((file.filename, file.mimetype, save_upload(file.stream)))
+    except BaseException:
+        remove_uploads(spooled)
+        raise
+    return spooled
+
+
+def remove_uploads(uploads):
+    for _, _, path in uploads:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def is_zip(filename, mime_type):
+    return mime_type in ZIP_TYPES or filename.lower().endswith(".zip")
+
+
+def archive_members(archive):
+    return [info for info in archive.infolist() if not info.is_dir() and not info.filename.startswith("__MACOSX/")]
+
+
+def count_batch_documents(uploads):
+    count = 0
+    for filename, mime_type, path in uploads:
+        if not is_zip(filename, mime_type):
+            count += 1
+            continue
+        try:
+            with zipfile.ZipFile(path) as archive:
+                count += len(archive_members(archive))
+        except zipfile.BadZipFile:
+            count += 1
+    return count
+
+
+def iter_batch_uploads(uploads):
+    """
+    (filename, path, mime type, error) for every upload, expanding ZIP archives one member at a time.
+
+    Each member is unpacked to disk just before it is yielded and deleted when the next one
+    is requested. A member that cannot be unpacked, or unpacks to more than MAX_UPLOAD_BYTES,
+    and an archive that cannot be opened get a path of None and the reason as error.
+    """
+    for filename, mime_type, path in uploads:
+        if not is_zip(filename, mime_type):
+            yield filename, path, mime_type, None
+            continue
+        try:
+            archive = zipfile.ZipFile(path)
+        except zipfile.BadZipFile as e:
+            yield filename, None, mime_type, f"not a valid ZIP archive: {e}"
+            continue
+        with archive:
+            for info in archive_members(archive):
+                member_type = mimetypes.guess_type(info.filename)[0] or "application/octet-stream"
+                # The sizes an archive declares are not trusted; the limit applies to the bytes unpacked.
+                try:
+                    with archive.open(info) as member:
+                        member_path = save_upload(member, limit=MAX_UPLOAD_BYTES)
+                except (UploadTooLarge, zipfile.BadZipFile, zlib.error, NotImplementedError, RuntimeError) as e:
+                    yield info.filename, None, member_type, str(e)
+                    continue
+                try:
+                    yield info.filename, member_path, member_type, None
+                finally:
+                    os.remove(member_path)
+
+
+def iter_batch_contents(uploads):
+    # A failing document becomes an error record instead of ending the whole stream.
+    for index, (filename, path, mime_type, error) in enumerate(iter_batch_uploads(uploads)):
+        timer = new_timer()
+        try:
+            if error is not None:
+                raise ValueError(error)
+            content, pages = extract_content(path, mime_type, timer)
+        except Exception as e:
+            DOCUMENTS.inc(doc_type=doc_type(mime_type), outcome="failed")
+            yield "", {"index": index, "filename": filename, "error": str(e)}
+            continue
+        # NER runs on a stream shared by the whole batch, so only extraction is timed per document.
+        record_document(timer, {"mime_type": mime_type, "size": os.path.getsize(path), "pages": pages}, "done")
+        yield content, {"index": index, "filename": filename}
+
+
+def queue_full_response(e):
+    response = jsonify({"error": "queue full", "detail": str(e)})
+    response.status_code = 429
+    response.headers["Retry-After"] = "5"
+    return response
+
+
+@app.before_request
+def start_request_metrics():
+    metrics.start()
+    HTTP_IN_FLIGHT.inc()
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    HTTP_SECONDS.observe(
+        time.perf_counter() - g.request_start, endpoint=endpoint, method=request.method, status=response.status_code
+    )
+    return response
+
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    if "request_start" in g:
+        HTTP_IN_FLIGHT.dec()
+
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    message = f"Uploads are limited to {MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
+    if request.path == "/extract":
+        return render_template("app.html", error=message), 413
+    return jsonify({"error": "upload too large", "detail": message}), 413
+
+
+def get_job_or_404(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        abort(404)
+    return job
+
+
+@app.route('/extract', methods=["POST"])
+def extract():
+    try:
+        job = submit_upload(request.files['file'])
+    except QueueFullError:
+        return render_template("app.html", error="The server is busy, please try again in a few seconds."), 429
+    return redirect(url_for("job_view", job_id=job.id), code=303)
+
+@app.route('/extract/batch', methods=["POST"])
+def extract_batch():
+    files = request.files.getlist('files') + request.files.getlist('file')
+    if not files:
+        return jsonify({"error": "no files uploaded"}), 400
+    # A batch holds a request thread until its last document, so only a few may run at once.
+    if not batch_slots.acquire(blocking=False):
+        response = jsonify({"error": "too many batches in progress", "detail": "use /jobs for single documents"})
+        response.status_code = 429
+        response.headers["Retry-After"] = "5"
+        return response
+
+    try:
+        uploads = spool_uploads(files)
+        documents = count_batch_documents(uploads)
+    except BaseException:
+        batch_slots.release()
+        raise
+    if documents > MAX_BATCH_DOCUMENTS:
+        remove_uploads(uploads)
+        batch_slots.release()
+        return jsonify({"error": f"{documents} documents in one batch, at most {MAX_BATCH_DOCUMENTS} allowed"}), 413
+
+    def generate():
+        # Lazy end to end: documents are read, extracted and tagged a small batch at a time.
+        results = iter_document_entities(nlp, iter_batch_contents(uploads), ner_chunking, batch_size=BATCH_NER_SIZE)
+        for content, record, entities in results:
+            if "error" not in record:
+                record["entities"] = entity_records(content, entities)
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+
+    def finish():
+        remove_uploads(uploads)
+        batch_slots.release()
+
+    # call_on_close also runs when the client goes away before the stream starts.
+    response = Response(generate(), mimetype="application/x-ndjson")
+    response.call_on_close(finish)
+    return response
+
+@app.route('/api/extract', methods=["POST"])
+def api_extract():
+    """JSON-only extraction: waits briefly for the job and falls back to the asynchronous job URLs."""
+    try:
+        job = submit_upload(request.files['file'])
+    except QueueFullError as e:
+        return queue_full_response(e)
+
+    job.done.wait(SYNC_WAIT_SECONDS)
+    return job_result(job.id)
+
+@app.route('/jobs/<job_id>/view')
+def job_view(job_id):
+    job = get_job_or_404(job_id)
+    if job.status == DONE:
+        return render_template(
+            "app.html", extracted_text=job.result["text"], entities=job.result["entities"],
+            pdf_path=url_for("download_pdf", job_id=job.id)
+        )
+    if job.status == FAILED:
+        return render_template("app.html", error=f"Extraction failed: {job.error}")
+    return render_template("app.html", job=job.to_dict())
+
+@app.route('/jobs', methods=["POST"])
+def submit_job():
+    try:
+        job = submit_upload(request.files['file'])
+    except QueueFullError as e:
+        return queue_full_response(e)
+
+    body = job.to_dict()
+    body["status_url"] = url_for("job_status", job_id=job.id)
+    body["result_url"] = url_for("job_result", job_id=job.id)
+    return jsonify(body), 202, {"Location": body["status_url"]}
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    return jsonify(get_job_or_404(job_id).to_dict())
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    job = get_job_or_404(job_id)
+    if job.status == DONE:
+        return jsonify(dict(
+            job.to_dict(), text=job.result["text"], entities=job.result["entities"],
+            pdf_url=url_for("download_pdf", job_id=job.id)
+        ))
+    if job.status == FAILED:
+        return jsonify(job.to_dict()), 500
+    return jsonify(dict(job.to_dict(), status_url=url_for("job_status", job_id=job.id))), 202
+
+@app.route('/download_pdf/<job_id>')
+def download_pdf(job_id):
+    job = get_job_or_404(job_id)
+    if job.status != DONE:
+        abort(404)
+    return send_file(io.BytesIO(get_report(job)), mimetype="application/pdf", as_attachment=True, download_name="SmartDoc_Extracted.pdf")
+
+@app.route('/jobs/stats')
+def job_stats():
+    return jsonify(job_queue.stats())
+
+@app.route('/health')
+def health():
+    is_ready = ready.is_set()
+    return jsonify({"status": "ok" if is_ready else "warming up", "ready": is_ready}), 200 if is_ready else 503
+
+@app.route('/ocr_cache/stats')
+def ocr_cache_stats():
+    return jsonify(ocr_cache.stats())
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
-    return render_template("app.html", extracted_text=content, entities=entities, pdf_path="/download_pdf")
+@app.route('/result_cache/stats')
+def result_cache_stats():
+    return jsonify(dict(result_cache.stats(), model_version=result_cache.model_version))
 
-@app.route('/download_pdf')
-def download_pdf():
-    temp_pdf_path = os.path.join(tempfile.gettempdir(), "output.pdf")
-    return send_file(temp_pdf_path, as_attachment=True, download_name="SmartDoc_Extracted.pdf")
+# Under gunicorn the app is imported in the master before the fork, and each worker warms itself up instead.
+if not os.environ.get("SMARTDOC_WARMUP_IN_WORKERS"):
+    start_warmup()
 
-# ✅ Run App
+# ✅ Run App (development server; production runs gunicorn -c gunicorn.conf.py app:app)
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
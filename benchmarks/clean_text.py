@@ -0,0 +1,90 @@
+"""
+Golden check and micro-benchmark: legacy multi-pass cleaner vs the single-pass clean_text.
+
+    python -m benchmarks.clean_text [--text-dir extracted_texts] [--repeat 3]
+
+Exits non-zero if any document cleans differently, so it doubles as a regression guard.
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import unicodedata
+from src.constants import EXTRACTED_TEXT_DIR
+from src.components.data_cleaner import clean_text
+
+
+def legacy_clean_text(text: str) -> str:
+    # What DataCleaner.clean_text did before the rewrite, pass for pass.
+    text = re.sub(r"-{2,}\s*Page\s*\d+\s*-{2,}", "", text)
+    text = ''.join(c for c in text if c.isprintable())
+    text = unicodedata.normalize("NFKC", text)
+    text = re.sub(r"-\n(\w+)", r"\1", text)
+
+    merged_lines = []
+    buffer = ""
+    for line in text.splitlines():
+        if line.strip() == "":
+            if buffer:
+                merged_lines.append(buffer.strip())
+                buffer = ""
+            merged_lines.append("")
+        else:
+            buffer += " " + line.strip() if buffer else line.strip()
+    if buffer:
+        merged_lines.append(buffer.strip())
+    text = "\n".join(merged_lines)
+
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"\s*[-–]\s*", ": ", text)
+    return text.strip()
+
+
+# Edge cases the corpus does not necessarily contain.
+SYNTHETIC = [
+    "",
+    "\n\n---- Page 1 ----\n",
+    "ﬁnal ＩＮＶＯＩＣＥ No – 42​\x00\x7f",
+    "Total -\namount\r\n\tdue now\x0c—end",
+    "ＡＢＣ　ｄｅｆ ½ ² Ⅻ ㎏ ﬀ",
+    "é café \U0001f600 ﻿BOM",
+]
+
+
+def _time(fn, texts, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--text-dir", default=str(EXTRACTED_TEXT_DIR))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    texts = []
+    for filename in sorted(os.listdir(args.text_dir)):
+        if filename.endswith(".txt"):
+            with open(os.path.join(args.text_dir, filename), encoding="utf-8") as f:
+                texts.append(f.read())
+
+    mismatches = sum(1 for text in texts + SYNTHETIC if legacy_clean_text(text) != clean_text(text))
+    legacy = _time(legacy_clean_text, texts, args.repeat)
+    single_pass = _time(clean_text, texts, args.repeat)
+
+    print(f"documents:   {len(texts)} (+{len(SYNTHETIC)} synthetic)")
+    print(f"mismatches:  {mismatches}")
+    print(f"legacy:      {legacy:.3f}s ({len(texts) / legacy:,.0f} docs/s)")
+    print(f"single-pass: {single_pass:.3f}s ({len(texts) / single_pass:,.0f} docs/s)")
+    print(f"speedup:     {legacy / single_pass:.1f}x")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
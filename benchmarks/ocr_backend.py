@@ -0,0 +1,83 @@
+"""
+Per-page OCR latency of the pytesseract (subprocess per page) and tesserocr (persistent engine pool) backends.
+
+    python -m benchmarks.ocr_backend [--pdf-dir data] [--pages 30] [--dpi 200] [--threads 1]
+
+Pages are rasterized once up front, so only OCR is timed. The first page of each backend
+is reported separately: it includes loading the language model, which the pool then keeps.
+Backends that are not installed are skipped. The script exits non-zero when the backends
+read any page differently.
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pdfplumber
+import pytesseract
+from src.constants import TESSERACT_CMD
+from src.components.ocr_backend import create_backend
+
+
+def load_pages(pdf_dir: str, count: int, dpi: int):
+    pages = []
+    for filename in sorted(f for f in os.listdir(pdf_dir) if f.lower().endswith(".pdf")):
+        with pdfplumber.open(os.path.join(pdf_dir, filename)) as pdf:
+            for page in pdf.pages:
+                pages.append(page.to_image(resolution=dpi).original.convert("L"))
+                page.close()
+                if len(pages) >= count:
+                    return pages
+    return pages
+
+
+def run(backend, pages, lang: str, threads: int):
+    def timed(image):
+        start = time.perf_counter()
+        text = backend.image_to_string(image, lang)
+        return text, time.perf_counter() - start
+
+    first_text, first_seconds = timed(pages[0])
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(timed, pages[1:]))
+    wall = time.perf_counter() - start
+    return [first_text] + [text for text, _ in results], first_seconds, [seconds for _, seconds in results], wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf-dir", default="data")
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--dpi", type=int, default=200)
+    parser.add_argument("--lang", default="eng")
+    parser.add_argument("--threads", type=int, default=1, help="concurrent OCR calls; also the tesserocr pool size")
+    args = parser.parse_args()
+
+    pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+    pages = load_pages(args.pdf_dir, max(2, args.pages), args.dpi)
+    print(f"pages: {len(pages)} at {args.dpi} dpi, {args.threads} thread(s)")
+
+    texts = {}
+    for name in ("pytesseract", "tesserocr"):
+        try:
+            backend = create_backend(name, args.threads)
+        except ImportError as e:
+            print(f"{name:12s} skipped: {e}")
+            continue
+        texts[name], first, latencies, wall = run(backend, pages, args.lang, args.threads)
+        backend.close()
+        print(
+            f"{name:12s} first page {first:.3f}s, then mean {np.mean(latencies):.3f}s "
+            f"p95 {np.percentile(latencies, 95):.3f}s per page, {(len(pages) - 1) / wall:.1f} pages/s"
+        )
+
+    if len(texts) == 2:
+        differing = sum(1 for a, b in zip(texts["pytesseract"], texts["tesserocr"]) if a.strip() != b.strip())
+        print(f"pages read differently: {differing}")
+        sys.exit(1 if differing else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Per-page OCR latency and accuracy with and without the preprocessing stage.
+
+    python -m benchmarks.ocr_preprocess [--pdf-dir data] [--reference-dir extracted_texts] [--limit 20]
+
+Every page is OCRed twice: as before (rasterized at --dpi, straight into Tesseract) and
+through HybridTextExtractor with OCRPreprocessConfig (first pass at target_dpi, grayscale,
+binarize, deskew, crop, full-resolution retry on low confidence). Both readings are scored
+against the existing extraction output by character similarity after whitespace
+normalisation. Exits non-zero when preprocessing loses more than --max-accuracy-drop.
+"""
+import os
+import re
+import sys
+import time
+import argparse
+from difflib import SequenceMatcher
+import pdfplumber
+import pytesseract
+from src.constants import TESSERACT_CMD
+from src.components.hybrid_extraction import HybridTextExtractor
+from src.entity.config_entity import HybridExtractionConfig, OCRPreprocessConfig
+
+PAGE_HEADER = re.compile(r"\n*---- Page \d+ ----\n")
+
+
+def reference_pages(path: str):
+    with open(path, encoding="utf-8") as f:
+        return PAGE_HEADER.split(f.read())[1:]
+
+
+def similarity(text: str, reference: str) -> float:
+    return SequenceMatcher(None, " ".join(text.split()), " ".join(reference.split()), autojunk=False).ratio()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf-dir", default="data")
+    parser.add_argument("--reference-dir", default="extracted_texts")
+    parser.add_argument("--limit", type=int, default=20, help="documents to OCR")
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--lang", default="eng")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.02)
+    args = parser.parse_args()
+
+    pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+    hybrid = HybridTextExtractor(HybridExtractionConfig(
+        dpi=args.dpi, lang=args.lang, text_layer_first=False, preprocess=OCRPreprocessConfig()
+    ))
+    first_dpi = hybrid.first_pass_dpi()
+
+    filenames = sorted(
+        f for f in os.listdir(args.pdf_dir)
+        if f.lower().endswith(".pdf") and os.path.exists(os.path.join(args.reference_dir, f[:-4] + ".txt"))
+    )[:args.limit]
+
+    baseline_time = preprocessed_time = 0.0
+    baseline_score = preprocessed_score = 0.0
+    pages = 0
+    for filename in filenames:
+        references = reference_pages(os.path.join(args.reference_dir, filename[:-4] + ".txt"))
+        with pdfplumber.open(os.path.join(args.pdf_dir, filename)) as pdf:
+            for page, reference in zip(pdf.pages, references):
+                start = time.perf_counter()
+                baseline = pytesseract.image_to_string(page.to_image(resolution=args.dpi).original, lang=args.lang)
+                baseline_time += time.perf_counter() - start
+
+                start = time.perf_counter()
+                preprocessed = hybrid.ocr_page(
+                    page.to_image(resolution=first_dpi).original, first_dpi,
+                    lambda dpi, page=page: page.to_image(resolution=dpi).original
+                )
+                preprocessed_time += time.perf_counter() - start
+
+                baseline_score += similarity(baseline, reference)
+                preprocessed_score += similarity(preprocessed, reference)
+                pages += 1
+                page.close()
+
+    if not pages:
+        print("no pages with reference text found")
+        sys.exit(1)
+
+    drop = (baseline_score - preprocessed_score) / pages
+    print(f"pages:         {pages} from {len(filenames)} documents")
+    print(f"baseline:      {baseline_time / pages:.2f}s/page at {args.dpi} dpi, similarity {baseline_score / pages:.3f}")
+    print(f"preprocessed:  {preprocessed_time / pages:.2f}s/page from {first_dpi} dpi, similarity {preprocessed_score / pages:.3f}")
+    print(f"speedup:       {baseline_time / preprocessed_time:.2f}x, accuracy change {-drop:+.3f}")
+    sys.exit(1 if drop > args.max_accuracy_drop else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Micro-benchmark: per-record BILUO/Example validation and set-based overlap removal vs span_alignment.
+
+    python -m benchmarks.span_alignment [--text-dir cleaned_texts] [--repeat 3]
+
+Field values come from match_fields, as in the field records the validator reads. Documents are
+tokenised once up front so only alignment is timed. Both implementations must agree when
+restricted to first occurrences; the script exits non-zero if they do not.
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import spacy
+from spacy.training import offsets_to_biluo_tags, Example
+from src.constants import CLEANED_TEXT_DIR
+from src.components.data_feild_extraction import match_fields
+from src.components.span_alignment import aligned_mask, align_values, has_overlaps, resolve_overlaps, token_bounds
+
+
+def first_hits(text: str, values):
+    entities = []
+    for value, label in values:
+        start = text.find(value)
+        if start != -1:
+            entities.append((start, start + len(value), label))
+    return entities
+
+
+def legacy_validate(doc, values) -> str:
+    # What NERDataCleaner.clean_data did per record.
+    entities = first_hits(doc.text, values)
+    try:
+        if "-" in offsets_to_biluo_tags(doc, entities):
+            return "misaligned"
+        Example.from_dict(doc, {"entities": entities})
+        return "valid"
+    except ValueError:
+        return "conflicting"
+
+
+def first_hit_validate(doc, values) -> str:
+    # span_alignment primitives restricted to the first occurrence, i.e. the legacy semantics.
+    entities = first_hits(doc.text, values)
+    if not entities:
+        return "valid"
+    starts = np.asarray([start for start, _, _ in entities])
+    ends = np.asarray([end for _, end, _ in entities])
+    mask = aligned_mask(token_bounds(doc), starts, ends)
+    if has_overlaps([e for e, ok in zip(entities, mask) if ok]):
+        return "conflicting"
+    return "valid" if mask.all() else "misaligned"
+
+
+def validate(doc, values) -> str:
+    entities, misaligned, _ = align_values(doc, values)
+    if has_overlaps(entities):
+        return "conflicting"
+    return "misaligned" if misaligned else "valid"
+
+
+def legacy_remove_overlapping_entities(entities):
+    # What NERTrainer.remove_overlapping_entities did: one set entry per covered character.
+    entities = sorted(entities, key=lambda x: (x[0], -(x[1] - x[0])))
+    result = []
+    occupied = set()
+    for start, end, label in entities:
+        if not any(pos in occupied for pos in range(start, end)):
+            result.append((start, end, label))
+            occupied.update(range(start, end))
+    return result
+
+
+def _time(fn, args, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for arg in args:
+            fn(*arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--text-dir", default=str(CLEANED_TEXT_DIR))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    nlp = spacy.blank("en")
+    samples = []
+    for filename in sorted(os.listdir(args.text_dir)):
+        if filename.endswith(".txt"):
+            with open(os.path.join(args.text_dir, filename), encoding="utf-8") as f:
+                text = f.read()
+            values = [(v.strip(), k.upper()) for k, v in match_fields(text).items() if v and v.strip()]
+            samples.append((nlp.make_doc(text), values))
+
+    legacy_status = [legacy_validate(doc, values) for doc, values in samples]
+    mismatches = sum(1 for (doc, values), status in zip(samples, legacy_status) if first_hit_validate(doc, values) != status)
+    overlap_inputs = [(first_hits(doc.text, values),) for doc, values in samples]
+    mismatches += sum(1 for (ents,) in overlap_inputs if legacy_remove_overlapping_entities(ents) != resolve_overlaps(ents))
+    recovered = sum(
+        1 for (doc, values), status in zip(samples, legacy_status)
+        if status == "misaligned" and validate(doc, values) == "valid"
+    )
+
+    legacy_validation = _time(legacy_validate, samples, args.repeat)
+    array_validation = _time(validate, samples, args.repeat)
+    legacy_overlaps = _time(legacy_remove_overlapping_entities, overlap_inputs, args.repeat)
+    sweep_overlaps = _time(resolve_overlaps, overlap_inputs, args.repeat)
+
+    print(f"documents:   {len(samples)}")
+    print(f"mismatches:  {mismatches}")
+    print(f"recovered:   {recovered} misaligned records aligned via a later occurrence")
+    print(f"validation:  legacy {legacy_validation:.3f}s, arrays {array_validation:.3f}s ({legacy_validation / array_validation:.1f}x)")
+    print(f"overlaps:    legacy {legacy_overlaps:.3f}s, sweep {sweep_overlaps:.3f}s ({legacy_overlaps / sweep_overlaps:.1f}x)")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Benchmark suite over the bundled corpus, with JSON results and a regression check.
+
+    python -m benchmarks.suite run [--only clean,ner] [--limit 200] [--pdf-limit 50] [--repeat 3] [--output benchmarks/results/latest.json]
+    python -m benchmarks.suite compare [--baseline benchmarks/results/baseline.json] [--current benchmarks/results/latest.json]
+
+Benchmarks:
+
+    clean    DataCleaner.clean_text on extracted_texts/
+    fields   FieldExtractor.extract_fields on cleaned_texts/ (needs en_core_web_sm)
+    ner      trained_invoice_ner inference, chunked as the app runs it, on cleaned_texts/
+    align    training-data alignment (align_values + resolve_overlaps, as NERTrainer.load_data)
+    extract  POST /extract end to end through the Flask test client, PDFs from data/
+    report   PDF report rendering (render_report) for cleaned_texts/ and their entities
+
+Inputs are the first --limit files in sorted order (--pdf-limit for extract), so every run
+sees the same documents. Each benchmark runs one warm-up item, then the whole set --repeat
+times; the fastest pass gives throughput and the per-item latency percentiles. The app's
+OCR and result caches are disabled so repeated uploads are not answered from cache.
+
+Record a baseline once with `run --output benchmarks/results/baseline.json`. compare flags a
+benchmark whose throughput dropped by more than --tolerance or whose p95 latency grew by
+more than --latency-tolerance, and exits non-zero if any regressed or went missing.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import tempfile
+from io import BytesIO
+from datetime import datetime, timezone
+import numpy as np
+from src.constants import CLEANED_TEXT_DIR, DATA_DIR, EXTRACTED_TEXT_DIR, TRAINED_MODEL_DIR
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+PERCENTILES = (50, 90, 95, 99)
+
+
+def read_texts(text_dir, limit: int):
+    names = sorted(f for f in os.listdir(text_dir) if f.endswith(".txt"))[:limit]
+    texts = []
+    for name in names:
+        with open(os.path.join(text_dir, name), encoding="utf-8") as f:
+            texts.append(f.read())
+    return texts
+
+
+def measure(fn, items, repeat: int) -> dict:
+    """Time fn on every item, `repeat` passes after one warm-up call; report the fastest pass."""
+    fn(items[0])
+    best = None
+    for _ in range(max(1, repeat)):
+        latencies = []
+        for item in items:
+            start = time.perf_counter()
+            fn(item)
+            latencies.append(time.perf_counter() - start)
+        if best is None or sum(latencies) < sum(best):
+            best = latencies
+
+    total = sum(best)
+    latency_ms = np.array(best) * 1000
+    result = {
+        "items": len(items),
+        "total_seconds": total,
+        "throughput": len(items) / total if total else 0.0,
+        "latency_ms": {"mean": float(latency_ms.mean()), "max": float(latency_ms.max())},
+    }
+    for p in PERCENTILES:
+        result["latency_ms"][f"p{p}"] = float(np.percentile(latency_ms, p))
+    return result
+
+
+# -- benchmarks: each returns (fn, items) --
+
+def bench_clean(args):
+    from src.components.data_cleaner import DataCleaner
+    from src.entity.config_entity import DataCleanerConfig
+
+    cleaner = DataCleaner(DataCleanerConfig(input_dir=args.extracted_dir, output_dir=tempfile.mkdtemp(prefix="bench_clean_")))
+    return cleaner.clean_text, read_texts(args.extracted_dir, args.limit)
+
+
+def bench_fields(args):
+    from src.components.data_feild_extraction import FieldExtractor
+    from src.entity.config_entity import FieldExtractionEntity
+
+    output_dir = tempfile.mkdtemp(prefix="bench_fields_")
+    extractor = FieldExtractor(FieldExtractionEntity(
+        cleaned_text_dir=args.cleaned_dir, output_json_path=os.path.join(output_dir, "fields.json")
+    ))
+    return extractor.extract_fields, read_texts(args.cleaned_dir, args.limit)
+
+
+def bench_ner(args):
+    import spacy
+    from src.components.chunked_ner import chunked_entities
+    from src.entity.config_entity import NERChunkingConfig
+
+    nlp = spacy.load(args.model_dir)
+    config = NERChunkingConfig()
+    return lambda text: chunked_entities(nlp, text, config), read_texts(args.cleaned_dir, args.limit)
+
+
+def bench_align(args):
+    import spacy
+    from src.components.data_prepare import FIELD_LABELS
+    from src.components.data_feild_extraction import match_fields
+    from src.components.span_alignment import align_values, resolve_overlaps
+
+    # Tokenised up front: NERTrainer.load_data tokenises once as well, and only alignment is measured here.
+    nlp = spacy.blank("en")
+    items = []
+    for text in read_texts(args.cleaned_dir, args.limit):
+        fields = match_fields(text)
+        values = [(fields[field].strip(), label) for field, label in FIELD_LABELS.items() if fields.get(field) and fields[field].strip()]
+        items.append((nlp.make_doc(text), values))
+
+    def align(item):
+        doc, values = item
+        entities, _, _ = align_values(doc, values)
+        return resolve_overlaps(entities)
+
+    return align, items
+
+
+def _load_app():
+    # Jobs go to a throwaway store, and neither cache may answer a repeated upload.
+    os.environ["SMARTDOC_JOB_DB"] = os.path.join(tempfile.mkdtemp(prefix="bench_jobs_"), "jobs.sqlite")
+    os.environ["SMARTDOC_RESULT_CACHE_DIR"] = ""
+    import app as smartdoc
+    from src.components.ocr_cache import OCRCache
+    from src.components.result_cache import ResultCache
+    from src.entity.config_entity import OCRCacheConfig
+
+    smartdoc.ocr_cache = OCRCache(OCRCacheConfig(cache_dir=None, memory_items=0))
+    smartdoc.result_cache = ResultCache(OCRCacheConfig(cache_dir=None, memory_items=0), model_dir=smartdoc.MODEL_DIR)
+    return smartdoc
+
+
+def bench_extract(args):
+    smartdoc = _load_app()
+    client = smartdoc.app.test_client()
+    names = sorted(f for f in os.listdir(args.pdf_dir) if f.lower().endswith(".pdf"))[:args.pdf_limit]
+    items = []
+    for name in names:
+        with open(os.path.join(args.pdf_dir, name), "rb") as f:
+            items.append((name, f.read()))
+
+    def extract(item):
+        name, data = item
+        response = client.post("/extract", data={"file": (BytesIO(data), name, "application/pdf")})
+        if response.status_code != 303:
+            raise RuntimeError(f"/extract answered {response.status_code} for {name}")
+        job = smartdoc.job_queue.get(response.headers["Location"].rstrip("/").split("/")[-2])
+        job.done.wait(smartdoc.SYNC_WAIT_SECONDS)
+        if job.status != smartdoc.DONE:
+            raise RuntimeError(f"job for {name} ended {job.status}: {job.error}")
+        page = client.get(response.headers["Location"])
+        if page.status_code != 200:
+            raise RuntimeError(f"job view answered {page.status_code} for {name}")
+
+    return extract, items
+
+
+def bench_report(args):
+    from src.components.chunked_ner import chunked_entities
+    from src.entity.config_entity import NERChunkingConfig
+
+    smartdoc = _load_app()
+    config = NERChunkingConfig()
+    items = [
+        (text, smartdoc.entity_records(text, chunked_entities(smartdoc.nlp, text, config)))
+        for text in read_texts(args.cleaned_dir, args.limit)
+    ]
+    return lambda item: smartdoc.render_report(*item), items
+
+
+BENCHMARKS = {
+    "clean": (bench_clean, "docs/s"),
+    "fields": (bench_fields, "docs/s"),
+    "ner": (bench_ner, "docs/s"),
+    "align": (bench_align, "docs/s"),
+    "extract": (bench_extract, "docs/s"),
+    "report": (bench_report, "reports/s"),
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        sys.exit(f"unknown benchmarks: {', '.join(unknown)} (choose from {', '.join(BENCHMARKS)})")
+
+    results = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": {"limit": args.limit, "pdf_limit": args.pdf_limit, "repeat": args.repeat},
+        "benchmarks": {},
+    }
+    for name in names:
+        setup, unit = BENCHMARKS[name]
+        try:
+            fn, items = setup(args)
+        except (ImportError, OSError) as e:
+            # Missing optional models or packages skip the benchmark rather than failing the suite.
+            print(f"{name:8s} skipped: {e}")
+            results["benchmarks"][name] = {"skipped": str(e)}
+            continue
+        if not items:
+            print(f"{name:8s} skipped: no input documents")
+            results["benchmarks"][name] = {"skipped": "no input documents"}
+            continue
+
+        try:
+            result = dict(measure(fn, items, args.repeat), unit=unit)
+        except Exception as e:
+            print(f"{name:8s} failed: {e}")
+            results["benchmarks"][name] = {"error": str(e)}
+            continue
+        results["benchmarks"][name] = result
+        latency = result["latency_ms"]
+        print(
+            f"{name:8s} {result['throughput']:10.1f} {unit:9s} p50 {latency['p50']:8.2f} ms  "
+            f"p95 {latency['p95']:8.2f} ms  p99 {latency['p99']:8.2f} ms  ({result['items']} items)"
+        )
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {args.output}")
+
+
+def compare(args):
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+
+    if baseline.get("settings") != current.get("settings"):
+        print(f"warning: settings differ (baseline {baseline.get('settings')}, current {current.get('settings')})")
+    if baseline.get("platform") != current.get("platform") or baseline.get("cpus") != current.get("cpus"):
+        print("warning: results come from different machines, timings may not be comparable")
+
+    regressions = 0
+    for name, before in baseline["benchmarks"].items():
+        after = current["benchmarks"].get(name)
+        if "throughput" not in before:
+            continue
+        if after is None or "throughput" not in after:
+            print(f"{name:8s} MISSING   {(after.get('skipped') or after.get('error')) if after else 'not run'}")
+            regressions += 1
+            continue
+
+        throughput = after["throughput"] / before["throughput"] - 1
+        p95 = after["latency_ms"]["p95"] / before["latency_ms"]["p95"] - 1
+        regressed = throughput < -args.tolerance or p95 > args.latency_tolerance
+        regressions += regressed
+        print(
+            f"{name:8s} {'REGRESSED' if regressed else 'ok':9s} throughput {before['throughput']:.1f} -> "
+            f"{after['throughput']:.1f} {after['unit']} ({throughput:+.1%}), p95 {before['latency_ms']['p95']:.2f} -> "
+            f"{after['latency_ms']['p95']:.2f} ms ({p95:+.1%})"
+        )
+
+    print(f"{regressions} regression(s)")
+    sys.exit(1 if regressions else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write JSON results")
+    run_parser.add_argument("--only", help="comma-separated subset of: " + ", ".join(BENCHMARKS))
+    run_parser.add_argument("--limit", type=int, default=200, help="text documents per benchmark")
+    run_parser.add_argument("--pdf-limit", type=int, default=50, help="PDFs uploaded by the extract benchmark")
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--extracted-dir", default=str(EXTRACTED_TEXT_DIR))
+    run_parser.add_argument("--cleaned-dir", default=str(CLEANED_TEXT_DIR))
+    run_parser.add_argument("--pdf-dir", default=str(DATA_DIR))
+    run_parser.add_argument("--model-dir", default=str(TRAINED_MODEL_DIR))
+    run_parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "latest.json"))
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="flag regressions against a stored baseline")
+    compare_parser.add_argument("--baseline", default=os.path.join(RESULTS_DIR, "baseline.json"))
+    compare_parser.add_argument("--current", default=os.path.join(RESULTS_DIR, "latest.json"))
+    compare_parser.add_argument("--tolerance", type=float, default=0.10, help="allowed throughput drop (0.10 = 10%%)")
+    compare_parser.add_argument("--latency-tolerance", type=float, default=0.25, help="allowed p95 latency growth")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
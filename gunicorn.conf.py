@@ -0,0 +1,54 @@
+"""
+Production server settings: gunicorn -c gunicorn.conf.py app:app
+
+app.py is imported once in the master (preload_app), so the spaCy model and fonts are
+loaded before the workers fork and share those pages copy-on-write. Each worker then runs
+its own warmup request in the background and answers /health with 503 until it is done. Settings come from
+the environment so each deployment can size itself:
+
+    SMARTDOC_WORKERS   worker processes (default: CPUs available to the container)
+    SMARTDOC_THREADS   request threads per worker (default: 4)
+    SMARTDOC_TIMEOUT   seconds before a silent worker is restarted (default: 120)
+    SMARTDOC_BIND      listen address (default: 0.0.0.0:5000)
+    SMARTDOC_METRICS_DIR  where workers publish metric snapshots for /metrics (default: a per-server temp dir)
+"""
+import gc
+import os
+import shutil
+import tempfile
+
+bind = os.environ.get("SMARTDOC_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("SMARTDOC_WORKERS", len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()))
+threads = int(os.environ.get("SMARTDOC_THREADS", 4))
+worker_class = "gthread"
+timeout = int(os.environ.get("SMARTDOC_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+
+preload_app = True
+accesslog = "-"
+
+# Read by app.py when it is preloaded below; each server starts from an empty directory.
+os.environ.setdefault("SMARTDOC_METRICS_DIR", os.path.join(tempfile.gettempdir(), f"smartdoc_metrics_{os.getpid()}"))
+shutil.rmtree(os.environ["SMARTDOC_METRICS_DIR"], ignore_errors=True)
+# Warmup threads started in the master would not survive the fork; post_fork starts one per worker.
+os.environ["SMARTDOC_WARMUP_IN_WORKERS"] = "1"
+
+
+def when_ready(server):
+    # Everything loaded so far is long-lived: move it out of the collector's reach so
+    # that gc passes in the workers do not touch (and so copy) the shared model pages.
+    gc.collect()
+    gc.freeze()
+    server.log.info(f"Model preloaded; starting {workers} workers x {threads} threads")
+
+
+def post_fork(server, worker):
+    import app
+    # A replacement for a crashed worker fails the jobs the old one left running.
+    app.job_queue.reap_orphans()
+    app.start_warmup()
+
+
+def on_exit(server):
+    shutil.rmtree(os.environ["SMARTDOC_METRICS_DIR"], ignore_errors=True)
@@ -1,4 +1,24 @@
+import os
+import argparse
 from src.pipeline import main_pipeline
+from src.components.profiling import PipelineProfiler
 run = main_pipeline.run_pipeline
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the SmartDoc-Extractor training pipeline")
+    parser.add_argument("--force", action="store_true", help="ignore stage manifests and rebuild everything")
+    parser.add_argument("--profile", action="store_true", help="time every stage and document, write traces to --profile-dir")
+    parser.add_argument("--profile-dir", default=os.path.join("artifacts", "profile"))
+    parser.add_argument("--cprofile", action="store_true", help="with --profile, also dump a cProfile per stage (<stage>.prof)")
+    parser.add_argument("--slowest", type=int, default=10, help="with --profile, how many of the slowest documents to report per stage")
+    args = parser.parse_args()
+
+    if not args.profile:
+        run(force=args.force)
+    else:
+        profiler = PipelineProfiler(args.profile_dir, cprofile=args.cprofile, top=args.slowest)
+        try:
+            run(force=args.force, profiler=profiler)
+        finally:
+            profiler.close()
+            print(profiler.report())
+            print(f"Traces and summary written to {args.profile_dir}")
@@ -0,0 +1,85 @@
+import re
+from collections import deque
+from typing import Iterable, Iterator, List, Optional, Tuple
+from src.components.span_alignment import Entity, resolve_overlaps
+from src.entity.config_entity import NERChunkingConfig
+
+# Preferred cut points, strongest first: page breaks, blank lines, sentence ends, line ends, any whitespace.
+BOUNDARIES = [
+    re.compile(r"\n*-{2,}\s*Page\s*\d+\s*-{2,}\n|\f"),
+    re.compile(r"\n[ \t]*\n"),
+    re.compile(r"(?<=[.!?])\s+"),
+    re.compile(r"\n"),
+    re.compile(r"\s+"),
+]
+WHITESPACE = re.compile(r"\s")
+
+
+def _last_boundary(text: str, floor: int, limit: int) -> Optional[int]:
+    for pattern in BOUNDARIES:
+        end = None
+        for match in pattern.finditer(text, floor, limit):
+            end = match.end()
+        if end is not None and end > floor:
+            return end
+    return None
+
+
+def split_chunks(text: str, max_chars: int, overlap: int) -> List[Tuple[int, int]]:
+    """
+    (start, end) offsets of chunks of at most max_chars covering text.
+
+    Each chunk ends on the strongest boundary found in its second half, falling back to a
+    hard cut, and the next one starts up to `overlap` characters earlier (moved forward to
+    a word start) so entities spanning a cut are seen whole by one of the two chunks.
+    """
+    chunks = []
+    start = 0
+    while len(text) - start > max_chars:
+        limit = start + max_chars
+        end = _last_boundary(text, start + max_chars // 2, limit) or limit
+        chunks.append((start, end))
+
+        next_start = max(end - overlap, start + 1)
+        space = WHITESPACE.search(text, next_start, end)
+        start = space.end() if space and space.end() < end else next_start
+    chunks.append((start, len(text)))
+    return chunks
+
+
+def merge_entities(entities: Iterable[Entity]) -> List[Entity]:
+    """Global-offset entities from all chunks, with copies from overlaps and partial edge hits removed."""
+    return resolve_overlaps(list(set(entities)))
+
+
+def iter_document_entities(nlp, documents: Iterable[Tuple[str, object]], config: Optional[NERChunkingConfig] = None,
+                           batch_size: int = 64, n_process: int = 1) -> Iterator[Tuple[str, object, List[Entity]]]:
+    """
+    Run NER over (text, context) pairs chunk by chunk and yield (text, context, entities) per document.
+
+    Chunks of every document go through a single nlp.pipe stream, so a long document is
+    spread across batches (and processes, with n_process > 1) while short ones pass
+    through as one chunk. Entity offsets are global to the document text. Documents come
+    out in input order, and only those with chunks in flight are held in memory.
+    """
+    config = config or NERChunkingConfig()
+    pending = deque()
+
+    def chunks():
+        for text, context in documents:
+            pending.append((text, context, []))
+            spans = split_chunks(text, config.max_chars, config.overlap)
+            for i, (start, end) in enumerate(spans):
+                yield text[start:end], (start, i == len(spans) - 1)
+
+    for doc, (offset, last) in nlp.pipe(chunks(), as_tuples=True, batch_size=batch_size, n_process=n_process):
+        text, context, entities = pending[0]
+        entities.extend((offset + ent.start_char, offset + ent.end_char, ent.label_) for ent in doc.ents)
+        if last:
+            pending.popleft()
+            yield text, context, merge_entities(entities)
+
+
+def chunked_entities(nlp, text: str, config: Optional[NERChunkingConfig] = None, n_process: int = 1) -> List[Entity]:
+    for _, _, entities in iter_document_entities(nlp, [(text, None)], config, n_process=n_process):
+        return entities
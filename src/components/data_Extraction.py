@@ -1,48 +1,312 @@
 import os
+import sys
+import time
+import tempfile
+from dataclasses import asdict
+from typing import Optional
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pdf2image import convert_from_path
+import pdfplumber
 import pytesseract
+from PIL import Image
 from src.logger import logging
 from src.exception import MyException
-from src.entity.config_entity import DataExtractionEntity
+from src.constants import TESSERACT_CMD
+from src.components.hybrid_extraction import HybridTextExtractor
+from src.components.ocr_backend import get_backend
+from src.components.ocr_cache import OCRCache
+from src.components.profiling import trace_document
+from src.components.stage_manifest import StageManifest
+from src.entity.config_entity import DataExtractionEntity, HybridExtractionConfig, OCRCacheConfig
 from src.entity.artifact_entity import DataExtractionArtifact
 
+
+def _init_ocr_worker(tesseract_cmd: str):
+    # Spawned workers (Windows/macOS) do not inherit the parent's pytesseract settings.
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def pdf_page_sizes(pdf_path: str):
+    """Page sizes in PDF points, read from the page tree without rendering anything."""
+    with pdfplumber.open(pdf_path) as pdf:
+        return [(page.width, page.height) for page in pdf.pages]
+
+
+def page_pixels(size, dpi: int) -> int:
+    width, height = size
+    return int(width * dpi / 72) * int(height * dpi / 72)
+
+
+def iter_page_images(pdf_path: str, dpi: int, first_page: int, last_page: int, temp_dir: str = None):
+    """Yield pages first_page..last_page as images, releasing each one once the caller is done with it."""
+    if temp_dir:
+        paths = convert_from_path(
+            pdf_path, dpi=dpi, first_page=first_page, last_page=last_page,
+            output_folder=temp_dir, paths_only=True
+        )
+        for path in paths:
+            with Image.open(path) as image:
+                yield image
+            os.remove(path)
+    else:
+        images = convert_from_path(pdf_path, dpi=dpi, first_page=first_page, last_page=last_page)
+        while images:
+            image = images.pop(0)
+            yield image
+            image.close()
+
+
+def render_page(pdf_path: str, page_number: int, dpi: int):
+    return convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number)[0]
+
+
+def ocr_pdf_page(pdf_path: str, page_number: int, hybrid: HybridTextExtractor, rasterize_to_disk: bool = False) -> str:
+    dpi = hybrid.first_pass_dpi()
+    with tempfile.TemporaryDirectory() if rasterize_to_disk else nullcontext() as temp_dir:
+        for image in iter_page_images(pdf_path, dpi, page_number, page_number, temp_dir):
+            return hybrid.ocr_page(image, dpi, lambda retry_dpi: render_page(pdf_path, page_number, retry_dpi))
+
+
+def extract_pdf_page(pdf_path: str, page_number: int, hybrid_config: HybridExtractionConfig,
+                     ocr_allowed: bool, rasterize_to_disk: bool = False, ocr_backend: str = "pytesseract"):
+    """Text of one page and where it came from: "text" (native layer), "ocr" or "rejected"."""
+    filename = os.path.basename(pdf_path)
+    with trace_document("extract", f"{filename} p{page_number}", document=filename, page=page_number):
+        # One page at a time per worker process, so one engine each.
+        hybrid = HybridTextExtractor(hybrid_config, get_backend(ocr_backend))
+        if hybrid_config.text_layer_first:
+            text = hybrid.read_page(pdf_path, page_number)
+            if not hybrid.needs_ocr(text):
+                return text, "text"
+        if not ocr_allowed:
+            return "", "rejected"
+        return ocr_pdf_page(pdf_path, page_number, hybrid, rasterize_to_disk), "ocr"
+
+
+def format_pages(page_texts) -> str:
+    return "\n".join(f"\n\n---- Page {i+1} ----\n{text}" for i, text in enumerate(page_texts))
+
+
 class DataExtractor:
-    def __init__(self, config: DataExtractionEntity):
+    def __init__(self, config: DataExtractionEntity, manifest: Optional[StageManifest] = None):
         self.config = config
+        self.manifest = manifest
         os.makedirs(self.config.output_dir, exist_ok=True)
 
-        
-        pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+
+        pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
         logging.info("🔧 Tesseract path set successfully.")
 
-    def extract_text_from_pdfs(self) -> DataExtractionArtifact:
-        try:
-            logging.info(f"📂 Starting PDF extraction from: {self.config.input_dir}")
+        self.hybrid = HybridTextExtractor(HybridExtractionConfig(
+            dpi=self.config.dpi,
+            lang=self.config.lang,
+            text_layer_first=self.config.text_layer_first,
+            min_chars=self.config.min_text_chars,
+            max_garbage_ratio=self.config.max_garbage_ratio,
+            preprocess=self.config.preprocess
+        ), get_backend(self.config.ocr_backend))
+
+        self.cache = None
+        if self.config.cache_dir:
+            self.cache = OCRCache(OCRCacheConfig(
+                cache_dir=self.config.cache_dir,
+                max_bytes=self.config.cache_max_bytes,
+                memory_items=0
+            ))
+
+    def _list_pdfs(self):
+        return sorted(f for f in os.listdir(self.config.input_dir) if f.lower().endswith(".pdf"))
+
+    def _write_output(self, filename: str, page_texts) -> str:
+        output_file = os.path.join(self.config.output_dir, filename.replace(".pdf", ".txt"))
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(format_pages(page_texts))
+        return output_file
+
+    def _cache_lookup(self, pdf_path: str):
+        """(key, cached page texts) for a document; both None when caching is off."""
+        if not self.cache:
+            return None, None
+        key = self.cache.make_key(
+            pdf_path, max_page_pixels=self.config.max_page_pixels, engine=self.hybrid.backend.version,
+            **asdict(self.hybrid.config)
+        )
+        return key, self.cache.get(key)
 
-            for filename in os.listdir(self.config.input_dir):
-                if filename.lower().endswith(".pdf"):
-                    pdf_path = os.path.join(self.config.input_dir, filename)
-                    text_output = []
+    def _documents_to_process(self, counts):
+        """
+        Yield (filename, pdf_path, fingerprint, cache_key) for documents that still need work.
 
-                    logging.info(f"📄 Processing file: {filename}")
-                    images = convert_from_path(pdf_path, dpi=300)
+        Documents the manifest already holds an up-to-date output for are skipped, and
+        cache hits are written straight away.
+        """
+        filenames = self._list_pdfs()
+        if self.manifest:
+            self.manifest.prune(filenames)
 
-                    for i, image in enumerate(images):
-                        text = pytesseract.image_to_string(image, lang="eng")
-                        text_output.append(f"\n\n---- Page {i+1} ----\n{text}")
+        for filename in filenames:
+            pdf_path = os.path.join(self.config.input_dir, filename)
+            fingerprint = None
+            if self.manifest:
+                fingerprint = self.manifest.fingerprint(pdf_path)
+                if self.manifest.is_current(filename, fingerprint):
+                    counts["skipped"] += 1
+                    continue
 
-                    output_file = os.path.join(self.config.output_dir, filename.replace(".pdf", ".txt"))
-                    with open(output_file, "w", encoding="utf-8") as f:
-                        f.write("\n".join(text_output))
+            cache_key, cached = self._cache_lookup(pdf_path)
+            if cached is not None:
+                self._finish_document(filename, fingerprint, None, cached)
+                logging.info(f"♻️ Cache hit: {filename}")
+                continue
 
+            yield filename, pdf_path, fingerprint, cache_key
+
+    def _finish_document(self, filename: str, fingerprint, cache_key, page_texts) -> str:
+        output_file = self._write_output(filename, page_texts)
+        if cache_key:
+            self.cache.put(cache_key, page_texts)
+        if self.manifest:
+            self.manifest.record(filename, fingerprint, [output_file])
+        return output_file
+
+    def _page_allowed(self, filename: str, page_number: int, size) -> bool:
+        pixels = page_pixels(size, self.config.dpi)
+        if self.config.max_page_pixels and pixels > self.config.max_page_pixels:
+            logging.warning(f"⚠️ {filename} page {page_number} too large to OCR: {pixels} px exceeds {self.config.max_page_pixels}")
+            return False
+        return True
+
+    def _ocr_pages(self, filename: str, pages):
+        """1-based page numbers that lack a usable text layer and pass the max_page_pixels guard."""
+        accepted = []
+        for page_number, (size, text) in enumerate(pages, start=1):
+            if self.hybrid.needs_ocr(text) and self._page_allowed(filename, page_number, size):
+                accepted.append(page_number)
+        return accepted
+
+    def _ocr_document(self, pdf_path: str, page_texts, accepted, temp_dir: str = None):
+        # Without streaming the window is the whole document, i.e. the original behaviour.
+        page_count = len(page_texts)
+        window = max(1, self.config.page_window) if self.config.streaming else max(1, page_count)
+
+        for first in range(1, page_count + 1, window):
+            last = min(first + window - 1, page_count)
+            wanted = [n for n in accepted if first <= n <= last]
+            if not wanted:
+                continue
+
+            if len(wanted) == last - first + 1:
+                ranges = [(first, last)]
+            else:
+                ranges = [(n, n) for n in wanted]
+
+            dpi = self.hybrid.first_pass_dpi()
+            for range_first, range_last in ranges:
+                images = iter_page_images(pdf_path, dpi, range_first, range_last, temp_dir)
+                for page_number, image in enumerate(images, start=range_first):
+                    page_texts[page_number - 1] = self.hybrid.ocr_page(
+                        image, dpi, lambda retry_dpi, n=page_number: render_page(pdf_path, n, retry_dpi)
+                    )
+
+        return page_texts
+
+    def _extract_serial(self):
+        counts = {"text": 0, "ocr": 0, "rejected": 0, "skipped": 0}
+        for filename, pdf_path, fingerprint, cache_key in self._documents_to_process(counts):
+            logging.info(f"📄 Processing file: {filename}")
+            with trace_document("extract", filename):
+                pages = self.hybrid.read_pages(pdf_path)
+                accepted = self._ocr_pages(filename, pages)
+                usable = [not self.hybrid.needs_ocr(text) for _, text in pages]
+                page_texts = [text if ok else "" for (_, text), ok in zip(pages, usable)]
+
+                with tempfile.TemporaryDirectory() if self.config.rasterize_to_disk else nullcontext() as temp_dir:
+                    text_output = self._ocr_document(pdf_path, page_texts, accepted, temp_dir)
+
+                output_file = self._finish_document(filename, fingerprint, cache_key, text_output)
+            from_text_layer = sum(usable)
+            counts["text"] += from_text_layer
+            counts["ocr"] += len(accepted)
+            counts["rejected"] += len(pages) - from_text_layer - len(accepted)
+            logging.info(f"✅ Text saved to: {output_file}")
+        return counts
+
+    def _extract_parallel(self):
+        # Pages, not files, are the unit of work so one long document cannot pin a worker.
+        counts = {"text": 0, "ocr": 0, "rejected": 0, "skipped": 0}
+        pending, page_sizes, documents = {}, {}, {}
+        for filename, pdf_path, fingerprint, cache_key in self._documents_to_process(counts):
+            documents[filename] = (fingerprint, cache_key)
+            page_sizes[filename] = pdf_page_sizes(pdf_path)
+            pending[filename] = [""] * len(page_sizes[filename])
+
+        total_pages = sum(len(texts) for texts in pending.values())
+        logging.info(f"⚙️ Extracting {total_pages} pages from {len(pending)} files on {self.config.num_workers} workers")
+
+        remaining = {filename: len(texts) for filename, texts in pending.items()}
+        for filename in [f for f, count in remaining.items() if count == 0]:
+            self._finish_document(filename, *documents[filename], pending.pop(filename))
+
+        with ProcessPoolExecutor(
+            max_workers=self.config.num_workers,
+            initializer=_init_ocr_worker,
+            initargs=(TESSERACT_CMD,),
+        ) as executor:
+            futures = {}
+            for filename in pending:
+                pdf_path = os.path.join(self.config.input_dir, filename)
+                for page_number, size in enumerate(page_sizes[filename], start=1):
+                    future = executor.submit(
+                        extract_pdf_page, pdf_path, page_number, self.hybrid.config,
+                        self._page_allowed(filename, page_number, size), self.config.rasterize_to_disk,
+                        self.config.ocr_backend
+                    )
+                    futures[future] = (filename, page_number - 1)
+
+            for future in as_completed(futures):
+                filename, page_index = futures.pop(future)
+                pending[filename][page_index], source = future.result()
+                counts[source] += 1
+                remaining[filename] -= 1
+
+                if remaining[filename] == 0:
+                    output_file = self._finish_document(filename, *documents[filename], pending.pop(filename))
                     logging.info(f"✅ Text saved to: {output_file}")
 
-            logging.info("🎉 Text extraction completed successfully.")
+        return counts
+
+    def extract_text_from_pdfs(self) -> DataExtractionArtifact:
+        try:
+            logging.info(f"📂 Starting PDF extraction from: {self.config.input_dir}")
+            start = time.perf_counter()
+
+            if self.config.num_workers > 1:
+                counts = self._extract_parallel()
+            else:
+                counts = self._extract_serial()
+
+            elapsed = time.perf_counter() - start
+            documents = len(self._list_pdfs()) - counts["skipped"]
+            pages = counts["text"] + counts["ocr"]
+            logging.info(
+                f"🎉 Text extraction completed: {documents} files, {pages} pages "
+                f"({counts['text']} from text layer, {counts['skipped']} files unchanged) in {elapsed:.1f}s"
+            )
             return DataExtractionArtifact(
                 extracted_dir=self.config.output_dir,
-                status="Success"
+                status="Success",
+                documents_processed=documents,
+                pages_processed=pages,
+                pages_rejected=counts["rejected"],
+                pages_from_text_layer=counts["text"],
+                documents_skipped=counts["skipped"],
+                cache_hits=self.cache.disk_hits if self.cache else 0,
+                cache_misses=self.cache.misses if self.cache else 0,
+                elapsed_seconds=elapsed,
+                pages_per_second=pages / elapsed if elapsed else 0.0
             )
 
         except Exception as e:
             logging.error("❌ Exception during text extraction", exc_info=True)
-            raise CustomException(e)
+            raise MyException(e, sys)
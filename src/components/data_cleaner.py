@@ -1,86 +1,159 @@
 import os
 import re
+import sys
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
 from src.logger import logging
 from src.exception import MyException
-from src.entity.config_entity 
+from src.components.profiling import trace_document
+from src.components.stage_manifest import StageManifest
 from src.entity.config_entity import DataCleanerConfig
-from src.entity.artifact_entity import DataExtractionArtifact
+from src.entity.artifact_entity import DataCleanerArtifact
 
-class DataCleaner:
-    def __init__(self, config: DataCleanerConfig):
-        self.config = config
-        os.makedirs(self.config.output_dir, exist_ok=True)
-        logging.info(f"📁 Output directory prepared: {self.config.output_dir}")
+PAGE_MARKER = re.compile(r"-{2,}\s*Page\s*\d+\s*-{2,}")
+HYPHEN_BREAK = re.compile(r"-\n(\w+)")
+SPACE_RUNS = re.compile(r"[ \t]+")
+DASHES = re.compile(r"\s*[-–]\s*")
+
+# Everything str.splitlines() breaks on; all of these are non-printable.
+LINE_BREAKS = re.compile("[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
 
-    def clean_text(self, text: str) -> str:
-        try:
-            
-            text = re.sub(r"-{2,}\s*Page\s*\d+\s*-{2,}", "", text)
 
-            
-            text = ''.join(c for c in text if c.isprintable())
+class _NonPrintableTable(dict):
+    """str.translate table deleting every character for which str.isprintable() is False.
 
-            
-            text = unicodedata.normalize("NFKC", text)
+    Entries are filled in the first time a code point is looked up, so the table stays as
+    small as the set of characters actually seen.
+    """
 
-            
-            text = re.sub(r"-\n(\w+)", r"\1", text)
+    def __missing__(self, code_point: int):
+        value = code_point if chr(code_point).isprintable() else None
+        self[code_point] = value
+        return value
 
-            
-            lines = text.splitlines()
-            merged_lines = []
-            buffer = ""
 
-            for line in lines:
-                if line.strip() == "":
-                    if buffer:
-                        merged_lines.append(buffer.strip())
-                        buffer = ""
-                    merged_lines.append("")
-                else:
-                    buffer += " " + line.strip() if buffer else line.strip()
+ASCII_NON_PRINTABLE = dict.fromkeys([*range(0x20), 0x7F])
+NON_PRINTABLE = _NonPrintableTable(ASCII_NON_PRINTABLE)
 
+
+def _merge_lines(text: str) -> str:
+    merged_lines = []
+    buffer = []
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
             if buffer:
-                merged_lines.append(buffer.strip())
+                merged_lines.append(" ".join(buffer))
+                buffer = []
+            merged_lines.append("")
+        else:
+            buffer.append(line)
 
-            text = "\n".join(merged_lines)
+    if buffer:
+        merged_lines.append(" ".join(buffer))
 
-            
-            text = re.sub(r"[ \t]+", " ", text)
+    return "\n".join(merged_lines)
 
-            
-            text = re.sub(r"\s*[-–]\s*", ": ", text)
 
-            return text.strip()
+def clean_text(text: str) -> str:
+    text = PAGE_MARKER.sub("", text)
 
-        except Exception as e:
-            logging.error("❌ Error in clean_text()", exc_info=True)
-            raise CustomException(e)
+    if text.isascii():
+        # NFKC leaves ASCII untouched, and the only non-printable ASCII is C0 controls and DEL.
+        text = text.translate(ASCII_NON_PRINTABLE)
+    else:
+        text = text.translate(NON_PRINTABLE)
+        text = unicodedata.normalize("NFKC", text)
 
-    def clean_all_texts(self) -> DataCleanerEntity:
-        try:
-            logging.info(f"🧹 Starting OCR cleaning from: {self.config.input_dir}")
+    # Dropping non-printables removes every line break, so the de-hyphenation and line
+    # merge only ever see one line. They still run if a break somehow survives.
+    if LINE_BREAKS.search(text):
+        text = HYPHEN_BREAK.sub(r"\1", text)
+        text = _merge_lines(text)
+    else:
+        text = text.strip()
+
+    text = SPACE_RUNS.sub(" ", text)
+    text = DASHES.sub(": ", text)
 
-            for filename in os.listdir(self.config.input_dir):
-                if filename.endswith(".txt"):
-                    input_path = os.path.join(self.config.input_dir, filename)
-                    with open(input_path, "r", encoding="utf-8") as f:
-                        raw_text = f.read()
+    return text.strip()
 
-                    cleaned = self.clean_text(raw_text)
 
-                    output_path = os.path.join(self.config.output_dir, filename)
-                    with open(output_path, "w", encoding="utf-8") as f:
-                        f.write(cleaned)
+def _clean_file(paths):
+    input_path, output_path = paths
+    with trace_document("clean", os.path.basename(input_path)):
+        with open(input_path, "r", encoding="utf-8") as f:
+            cleaned = clean_text(f.read())
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(cleaned)
+    return output_path
 
+
+class DataCleaner:
+    def __init__(self, config: DataCleanerConfig, manifest: Optional[StageManifest] = None):
+        self.config = config
+        self.manifest = manifest
+        os.makedirs(self.config.output_dir, exist_ok=True)
+        logging.info(f"📁 Output directory prepared: {self.config.output_dir}")
+
+    def clean_text(self, text: str) -> str:
+        try:
+            return clean_text(text)
+
+        except Exception as e:
+            logging.error("❌ Error in clean_text()", exc_info=True)
+            raise MyException(e, sys)
+
+    def clean_all_texts(self) -> DataCleanerArtifact:
+        try:
+            logging.info(f"🧹 Starting OCR cleaning from: {self.config.input_dir}")
+            processed, skipped = 0, 0
+
+            filenames = sorted(f for f in os.listdir(self.config.input_dir) if f.endswith(".txt"))
+            if self.manifest:
+                self.manifest.prune(filenames)
+
+            jobs = []
+            for filename in filenames:
+                input_path = os.path.join(self.config.input_dir, filename)
+                fingerprint = None
+                if self.manifest:
+                    fingerprint = self.manifest.fingerprint(input_path)
+                    if self.manifest.is_current(filename, fingerprint):
+                        skipped += 1
+                        continue
+                jobs.append((filename, fingerprint, input_path, os.path.join(self.config.output_dir, filename)))
+
+            paths = [(input_path, output_path) for _, _, input_path, output_path in jobs]
+            if self.config.num_workers > 1 and len(jobs) > 1:
+                executor = ProcessPoolExecutor(max_workers=self.config.num_workers)
+                chunksize = max(1, len(jobs) // (self.config.num_workers * 4))
+                results = executor.map(_clean_file, paths, chunksize=chunksize)
+            else:
+                executor = None
+                results = map(_clean_file, paths)
+
+            try:
+                # Results arrive in submission order, so each one is recorded as soon as it lands.
+                for (filename, fingerprint, _, _), output_path in zip(jobs, results):
+                    if self.manifest:
+                        self.manifest.record(filename, fingerprint, [output_path])
+                    processed += 1
                     logging.info(f"✅ Cleaned text saved: {filename}")
+            finally:
+                if executor:
+                    executor.shutdown()
 
-            return DataCleanerEntity(
+            logging.info(f"🧹 Cleaning done: {processed} cleaned, {skipped} unchanged")
+            return DataCleanerArtifact(
                 cleaned_dir=self.config.output_dir,
-                status="Success"
+                status="Success",
+                documents_processed=processed,
+                documents_skipped=skipped
             )
 
         except Exception as e:
             logging.error("❌ Error during cleaning phase", exc_info=True)
-            raise CustomException(e)
+            raise MyException(e, sys)
@@ -1,136 +1,403 @@
 import os
 import re
+import sys
+import csv
 import json
 import spacy
-from typing import Dict
+from contextlib import ExitStack
+from typing import Dict, Iterator, Optional
 from src.logger import logging
 from src.exception import MyException
-from src.entity.config_entity import DataFeildGetterEntity
-from src.entity.artifact_entity import DataFeildGetterArtifact
+from src.entity.config_entity import FieldExtractionEntity, NERChunkingConfig
+from src.components.chunked_ner import iter_document_entities
+from src.components.profiling import TraceClock
+from src.components.stage_manifest import StageManifest
+from src.entity.artifact_entity import FieldExtractionArtifact
+
+FIELD_PATTERNS = {
+    "Invoice Number": r"(Invoice No|Invoice #|Invoice ID|Invoice Ref|Inv No|Document No|Receipt No|Bill No)[^\n:]*[:]\s*([A-Z0-9\-/]+)",
+    "Revision Number": r"(Revision No|Revision Number|Version)[^\n:]*[:]\s*(.+)",
+    "Reference Number": r"(Reference No|Ref No|Reference Number)[^\n:]*[:]\s*([A-Z0-9\-]+)",
+    "PO Number": r"(PO Number|Purchase Order|Order No|Order Number)[^\n:]*[:]\s*(.+)",
+    "Challan Number": r"(Challan No|Challan Number|Challan ID)[^\n:]*[:]\s*(.+)",
+    "Dispatch Document No": r"(Dispatch Document No|Dispatch Doc No|Dispatch Ref)[^\n:]*[:]\s*(.+)",
+    "Delivery Note": r"(Delivery Note|Delivery Challan)[^\n:]*[:]\s*(.+)",
+    "LR Number": r"(LR No|Lorry Receipt No|LR Number)[^\n:]*[:]\s*(.+)",
+    "HSN Code": r"(HSN Code|HS Code|SAC Code)[^\n:]*[:]\s*([A-Z0-9]+)",
+    "Issue Date": r"(Issue Date|Invoice Date|Date of Issue)[^\n:]*[:]\s*(.+)",
+    "Due Date": r"(Due Date|Payment Due|Expiry Date)[^\n:]*[:]\s*(.+)",
+    "Delivery Date": r"(Delivery Date|Dispatch Date)[^\n:]*[:]\s*(.+)",
+    "Bill From": r"(From|Seller|Supplier|Issued By)[^\n:]*[:]\s*(.+)",
+    "Bill To": r"(To|Buyer|Customer|Client|Purchaser|Billed To)[^\n:]*[:]\s*(.+)",
+    "Shipping Address": r"(Ship To|Delivery Address|Dispatch Address|Consignee)[^\n:]*[:]\s*(.+)",
+    "Authorized Signatory": r"(Authorized Signatory|Authorized Person)[^\n:]*[:]\s*(.+)",
+    "Contact Email": r"(Email|E-mail|Email ID|Contact Email)[^\n:]*[:]\s*([\w\.-]+@[\w\.-]+)",
+    "Contact Phone": r"(Phone|Mobile|Tel|Telephone|Contact No)[^\n:]*[:]\s*([0-9\-\+ ]+)",
+    "GST Number": r"(GST No|GSTIN|GST Number|GST Registration)[^\n:]*[:]\s*([0-9A-Z]+)",
+    "PAN Number": r"(PAN No|PAN Number|PAN)[^\n:]*[:]\s*([A-Z0-9]+)",
+    "VAT Number": r"(VAT No|VAT Number)[^\n:]*[:]\s*([A-Z0-9]+)",
+    "Service Tax Number": r"(Service Tax No|Service Tax Number)[^\n:]*[:]\s*([A-Z0-9]+)",
+    "Vehicle Number": r"(Vehicle No|Vehicle Number|Truck No|Truck Number)[^\n:]*[:]\s*([A-Z0-9\-]+)",
+    "Transporter Name": r"(Transporter Name|Carrier Name|Logistics Partner)[^\n:]*[:]\s*(.+)",
+    "E-way Bill No": r"(E[- ]?Way Bill No|Eway Bill Number)[^\n:]*[:]\s*([A-Z0-9\-]+)",
+    "Payment Terms": r"(Payment Terms|Terms of Payment)[^\n:]*[:]\s*(.+)",
+    "Payment Info": r"(Payment Method|Payment Mode|Payment Type|Terms)[^\n:]*[:]\s*(.+)",
+    "Currency": r"(Currency|Curr)[^\n:]*[:]\s*(\w+)",
+    "Total Amount": r"(Total Amount|Grand Total|Amount Due|Total|Net Total|Payable Amount)[^\n:]*[:]\s*\$?([0-9\.,]+)",
+    "Tax Amount": r"(Tax|GST|VAT|IGST|CGST|SGST|Service Tax)[^\n:]*[:]\s*\$?([0-9\.,]+)",
+    "Advance Payment": r"(Advance Paid|Advance Payment)[^\n:]*[:]\s*\$?([0-9\.,]+)",
+    "Balance Due": r"(Balance Due|Amount Due)[^\n:]*[:]\s*\$?([0-9\.,]+)",
+    "Amount in Words": r"(Amount in Words)[^\n:]*[:]\s*(.+)",
+    "Bank Account": r"(Account No|Bank Account No|A/c No|Account Number)[^\n:]*[:]\s*([A-Z0-9\- ]+)",
+    "IFSC Code": r"(IFSC Code|Bank IFSC)[^\n:]*[:]\s*([A-Z0-9]+)",
+    "SWIFT Code": r"(SWIFT Code|SWIFT)[^\n:]*[:]\s*([A-Z0-9]+)",
+    "IBAN": r"(IBAN|IBAN Number)[^\n:]*[:]\s*([A-Z0-9]+)",
+    "Country of Origin": r"(Country of Origin)[^\n:]*[:]\s*(.+)",
+    "Country of Destination": r"(Country of Destination|Destination Country)[^\n:]*[:]\s*(.+)",
+    "Port of Loading": r"(Port of Loading)[^\n:]*[:]\s*(.+)",
+    "Port of Discharge": r"(Port of Discharge)[^\n:]*[:]\s*(.+)",
+    "Remarks": r"(Remarks|Notes|Additional Information)[^\n:]*[:]\s*(.+)",
+    "Terms and Conditions": r"(Terms and Conditions|Conditions)[^\n:]*[:]\s*(.+)"
+}
+
+COMPILED_FIELD_PATTERNS = {field: re.compile(pattern, re.I) for field, pattern in FIELD_PATTERNS.items()}
+
+# Non-ASCII characters that re.IGNORECASE folds onto an ASCII letter (İ, ı, ſ, Kelvin sign).
+# Text containing them cannot be prefiltered with str.lower() and takes the plain re.search path.
+_ASCII_FOLDING = re.compile("[\u0130\u0131\u017f\u212a]")
+
+
+def _expand_optionals(label: str):
+    """Expand `[..]?` character classes, e.g. "E[- ]?Way" -> "E-Way", "E Way", "EWay"."""
+    match = re.search(r"\[([^\]]+)\]\?", label)
+    if not match:
+        return [label]
+    return [
+        variant
+        for option in list(match.group(1)) + [""]
+        for variant in _expand_optionals(label[:match.start()] + option + label[match.end():])
+    ]
+
+
+def _label_keywords(pattern: str):
+    """Literal label alternatives of a pattern's first group, lower-cased."""
+    group = pattern[1:pattern.index(")")]
+    return {keyword.lower() for label in group.split("|") for keyword in _expand_optionals(label)}
+
+
+def _trie_pattern(words) -> str:
+    """
+    Regex alternation shaped as a prefix trie, e.g. "invoice(?: (?:#|id|no|ref))?".
+
+    Branches are tried longest-first, so it reports the longest word at a position.
+    Shared prefixes are compared once instead of once per word.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        children = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not children:
+            return ""
+        body = children[0] if len(children) == 1 else "(?:" + "|".join(children) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def _build_keyword_index():
+    keyword_fields = {}
+    for field, pattern in FIELD_PATTERNS.items():
+        for keyword in _label_keywords(pattern):
+            keyword_fields.setdefault(keyword, set()).add(field)
+
+    # The scanner reports the longest keyword starting at each position; every shorter
+    # keyword that is a prefix of it starts there too, so fold their fields in.
+    fields_at = {
+        keyword: {f for other, fs in keyword_fields.items() if keyword.startswith(other) for f in fs}
+        for keyword in keyword_fields
+    }
+    return re.compile(f"(?=({_trie_pattern(keyword_fields)}))"), fields_at
+
+
+KEYWORD_SCANNER, FIELDS_AT_KEYWORD = _build_keyword_index()
+
+# Only doc.ents is read, so the components that feed nothing into NER are switched off.
+UNUSED_PIPES = ["tagger", "parser", "attribute_ruler", "lemmatizer"]
+
+ENTITY_FIELDS = {
+    "ORG": "Organizations",
+    "PERSON": "Persons",
+    "GPE": "Addresses",
+    "DATE": "Dates",
+    "MONEY": "Amounts",
+}
+
+FIELD_COLUMNS = list(ENTITY_FIELDS.values()) + list(FIELD_PATTERNS)
+
+
+def iter_field_records(path: str) -> Iterator[Dict]:
+    """
+    Lazily yield field records from a FieldExtractor output.
+
+    JSONL is read one line at a time. A legacy JSON array is still accepted, but it is
+    loaded whole.
+    """
+    with open(path, encoding="utf-8") as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        f.seek(0)
+
+        if first == "[":
+            yield from json.load(f)
+            return
+
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class ParquetFieldWriter:
+    """Buffers field records into Parquet row groups of `row_group_size` rows."""
+
+    def __init__(self, path: str, row_group_size: int):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("parquet_path requires pyarrow: pip install pyarrow") from e
+
+        self._pa = pa
+        self.columns = ["Filename"] + FIELD_COLUMNS
+        self.schema = pa.schema([(column, pa.string()) for column in self.columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.row_group_size = max(1, row_group_size)
+        self.buffer = {column: [] for column in self.columns}
+        self.buffered = 0
+
+    def write(self, record: Dict):
+        for column in self.columns:
+            self.buffer[column].append(record.get(column))
+        self.buffered += 1
+        if self.buffered >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffered:
+            self.writer.write_table(self._pa.table(self.buffer, schema=self.schema))
+            self.buffer = {column: [] for column in self.columns}
+            self.buffered = 0
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def match_fields(text: str) -> Dict[str, Optional[str]]:
+    """
+    Same result as running re.search(pattern, text, re.I) for every FIELD_PATTERNS entry.
+
+    Every pattern starts with a literal label, so a match can only begin where one of its
+    labels occurs. One scan of the lower-cased text collects those positions per field and
+    each compiled pattern is then anchored only there, in order, instead of being searched
+    across the whole document.
+    """
+    if not text.isascii() and (_ASCII_FOLDING.search(text) or len(text.lower()) != len(text)):
+        results = {}
+        for field, pattern in COMPILED_FIELD_PATTERNS.items():
+            match = pattern.search(text)
+            results[field] = match.group(pattern.groups) if match else None
+        return results
+
+    candidates = {}
+    for hit in KEYWORD_SCANNER.finditer(text.lower()):
+        for field in FIELDS_AT_KEYWORD[hit.group(1)]:
+            candidates.setdefault(field, []).append(hit.start())
+
+    results = dict.fromkeys(FIELD_PATTERNS)
+    for field, positions in candidates.items():
+        pattern = COMPILED_FIELD_PATTERNS[field]
+        for position in positions:
+            match = pattern.match(text, position)
+            if match:
+                results[field] = match.group(pattern.groups)
+                break
+    return results
+
 
 class FieldExtractor:
-    def __init__(self, config: DataFeildGetterEntity):
+    def __init__(self, config: FieldExtractionEntity, manifest: Optional[StageManifest] = None):
         self.config = config
-        os.makedirs(self.config.output_dir, exist_ok=True)
-        self.nlp = spacy.load("en_core_web_sm")
-        logging.info("🔍 SpaCy model loaded for NER field extraction")
+        self.manifest = manifest
+        os.makedirs(os.path.dirname(self.config.output_json_path) or ".", exist_ok=True)
+        if self.manifest:
+            if not self.config.records_dir:
+                raise ValueError("FieldExtractor with a manifest needs config.records_dir")
+            os.makedirs(self.config.records_dir, exist_ok=True)
+        self.nlp = spacy.load(self.config.model, disable=UNUSED_PIPES)
+        self.chunking = NERChunkingConfig(max_chars=config.ner_max_chars, overlap=config.ner_chunk_overlap)
+        logging.info(f"🔍 SpaCy model loaded for NER field extraction (active pipes: {self.nlp.pipe_names})")
+
+    def _fields_from_entities(self, text: str, entities) -> Dict:
+        fields = {name: set() for name in ENTITY_FIELDS.values()}
+
+        for start, end, label in entities:
+            if label in ENTITY_FIELDS:
+                fields[ENTITY_FIELDS[label]].add(text[start:end])
+
+        fields.update(match_fields(text))
+
+        for key in fields:
+            if isinstance(fields[key], set):
+                fields[key] = ", ".join(fields[key]) if fields[key] else None
+
+        return fields
+
+    def _entities(self, documents):
+        """(text, context, entities) per document, long texts run through NER in overlapping chunks."""
+        return iter_document_entities(
+            self.nlp,
+            documents,
+            self.chunking,
+            batch_size=self.config.batch_size,
+            n_process=self.config.n_process
+        )
 
     def extract_fields(self, text: str) -> Dict:
         try:
-            doc = self.nlp(text)
-
-            fields = {
-                "Organizations": set(),
-                "Persons": set(),
-                "Addresses": set(),
-                "Dates": set(),
-                "Amounts": set(),
-            }
-
-            for ent in doc.ents:
-                if ent.label_ == "ORG":
-                    fields["Organizations"].add(ent.text)
-                elif ent.label_ == "PERSON":
-                    fields["Persons"].add(ent.text)
-                elif ent.label_ == "GPE":
-                    fields["Addresses"].add(ent.text)
-                elif ent.label_ == "DATE":
-                    fields["Dates"].add(ent.text)
-                elif ent.label_ == "MONEY":
-                    fields["Amounts"].add(ent.text)
-
-            
-            regex_patterns = {
-                "Invoice Number": r"(Invoice No|Invoice #|Invoice ID|Invoice Ref|Inv No|Document No|Receipt No|Bill No)[^\n:]*[:]\s*([A-Z0-9\-/]+)",
-                "Revision Number": r"(Revision No|Revision Number|Version)[^\n:]*[:]\s*(.+)",
-                "Reference Number": r"(Reference No|Ref No|Reference Number)[^\n:]*[:]\s*([A-Z0-9\-]+)",
-                "PO Number": r"(PO Number|Purchase Order|Order No|Order Number)[^\n:]*[:]\s*(.+)",
-                "Challan Number": r"(Challan No|Challan Number|Challan ID)[^\n:]*[:]\s*(.+)",
-                "Dispatch Document No": r"(Dispatch Document No|Dispatch Doc No|Dispatch Ref)[^\n:]*[:]\s*(.+)",
-                "Delivery Note": r"(Delivery Note|Delivery Challan)[^\n:]*[:]\s*(.+)",
-                "LR Number": r"(LR No|Lorry Receipt No|LR Number)[^\n:]*[:]\s*(.+)",
-                "HSN Code": r"(HSN Code|HS Code|SAC Code)[^\n:]*[:]\s*([A-Z0-9]+)",
-                "Issue Date": r"(Issue Date|Invoice Date|Date of Issue)[^\n:]*[:]\s*(.+)",
-                "Due Date": r"(Due Date|Payment Due|Expiry Date)[^\n:]*[:]\s*(.+)",
-                "Delivery Date": r"(Delivery Date|Dispatch Date)[^\n:]*[:]\s*(.+)",
-                "Bill From": r"(From|Seller|Supplier|Issued By)[^\n:]*[:]\s*(.+)",
-                "Bill To": r"(To|Buyer|Customer|Client|Purchaser|Billed To)[^\n:]*[:]\s*(.+)",
-                "Shipping Address": r"(Ship To|Delivery Address|Dispatch Address|Consignee)[^\n:]*[:]\s*(.+)",
-                "Authorized Signatory": r"(Authorized Signatory|Authorized Person)[^\n:]*[:]\s*(.+)",
-                "Contact Email": r"(Email|E-mail|Email ID|Contact Email)[^\n:]*[:]\s*([\w\.-]+@[\w\.-]+)",
-                "Contact Phone": r"(Phone|Mobile|Tel|Telephone|Contact No)[^\n:]*[:]\s*([0-9\-\+ ]+)",
-                "GST Number": r"(GST No|GSTIN|GST Number|GST Registration)[^\n:]*[:]\s*([0-9A-Z]+)",
-                "PAN Number": r"(PAN No|PAN Number|PAN)[^\n:]*[:]\s*([A-Z0-9]+)",
-                "VAT Number": r"(VAT No|VAT Number)[^\n:]*[:]\s*([A-Z0-9]+)",
-                "Service Tax Number": r"(Service Tax No|Service Tax Number)[^\n:]*[:]\s*([A-Z0-9]+)",
-                "Vehicle Number": r"(Vehicle No|Vehicle Number|Truck No|Truck Number)[^\n:]*[:]\s*([A-Z0-9\-]+)",
-                "Transporter Name": r"(Transporter Name|Carrier Name|Logistics Partner)[^\n:]*[:]\s*(.+)",
-                "E-way Bill No": r"(E[- ]?Way Bill No|Eway Bill Number)[^\n:]*[:]\s*([A-Z0-9\-]+)",
-                "Payment Terms": r"(Payment Terms|Terms of Payment)[^\n:]*[:]\s*(.+)",
-                "Payment Info": r"(Payment Method|Payment Mode|Payment Type|Terms)[^\n:]*[:]\s*(.+)",
-                "Currency": r"(Currency|Curr)[^\n:]*[:]\s*(\w+)",
-                "Total Amount": r"(Total Amount|Grand Total|Amount Due|Total|Net Total|Payable Amount)[^\n:]*[:]\s*\$?([0-9\.,]+)",
-                "Tax Amount": r"(Tax|GST|VAT|IGST|CGST|SGST|Service Tax)[^\n:]*[:]\s*\$?([0-9\.,]+)",
-                "Advance Payment": r"(Advance Paid|Advance Payment)[^\n:]*[:]\s*\$?([0-9\.,]+)",
-                "Balance Due": r"(Balance Due|Amount Due)[^\n:]*[:]\s*\$?([0-9\.,]+)",
-                "Amount in Words": r"(Amount in Words)[^\n:]*[:]\s*(.+)",
-                "Bank Account": r"(Account No|Bank Account No|A/c No|Account Number)[^\n:]*[:]\s*([A-Z0-9\- ]+)",
-                "IFSC Code": r"(IFSC Code|Bank IFSC)[^\n:]*[:]\s*([A-Z0-9]+)",
-                "SWIFT Code": r"(SWIFT Code|SWIFT)[^\n:]*[:]\s*([A-Z0-9]+)",
-                "IBAN": r"(IBAN|IBAN Number)[^\n:]*[:]\s*([A-Z0-9]+)",
-                "Country of Origin": r"(Country of Origin)[^\n:]*[:]\s*(.+)",
-                "Country of Destination": r"(Country of Destination|Destination Country)[^\n:]*[:]\s*(.+)",
-                "Port of Loading": r"(Port of Loading)[^\n:]*[:]\s*(.+)",
-                "Port of Discharge": r"(Port of Discharge)[^\n:]*[:]\s*(.+)",
-                "Remarks": r"(Remarks|Notes|Additional Information)[^\n:]*[:]\s*(.+)",
-                "Terms and Conditions": r"(Terms and Conditions|Conditions)[^\n:]*[:]\s*(.+)"
-            }
-
-            for field, pattern in regex_patterns.items():
-                match = re.search(pattern, text, re.I)
-                fields[field] = match.group(len(match.groups())) if match else None
-
-            
-            for key in fields:
-                if isinstance(fields[key], set):
-                    fields[key] = ", ".join(fields[key]) if fields[key] else None
-
-            return fields
+            for _, _, entities in self._entities([(text, None)]):
+                return self._fields_from_entities(text, entities)
 
         except Exception as e:
             logging.error("❌ Error in extract_fields()", exc_info=True)
-            raise CustomException(e)
+            raise MyException(e, sys)
+
+    def _filenames(self):
+        return sorted(f for f in os.listdir(self.config.cleaned_text_dir) if f.endswith(".txt"))
+
+    def _iter_texts(self, filenames):
+        """Yield (text, filename) one file at a time so nlp.pipe never needs the corpus in memory."""
+        for filename in filenames:
+            file_path = os.path.join(self.config.cleaned_text_dir, filename)
+            with open(file_path, "r", encoding="utf-8") as f:
+                yield f.read(), filename
+
+    def _record_path(self, filename: str) -> str:
+        return os.path.join(self.config.records_dir, os.path.splitext(filename)[0] + ".json")
+
+    def _iter_new_fields(self, filenames):
+        # NER runs batched, so a document's trace is the wait for its entities plus field matching.
+        clock = TraceClock()
+        for text, filename, entities in self._entities(self._iter_texts(filenames)):
+            fields = self._fields_from_entities(text, entities)
+            fields["Filename"] = filename
+            fields["Text"] = text
+            clock.record("fields", filename, chars=len(text))
+            yield fields
+            clock.reset()
 
-    def extract_fields_from_all(self) -> DataFeildGetterArtifact:
+    def _iter_field_records(self):
+        """
+        (fields, reused) for every cleaned text, in filename order.
+
+        With a manifest, texts it holds a current record for are read back from records_dir
+        and only new or changed texts go through NER. Each new record is journaled as soon
+        as it is produced, so a crashed run resumes after the last finished document.
+        """
+        filenames = self._filenames()
+        pending = {}
+        if self.manifest:
+            self.manifest.prune(filenames)
+            for filename in filenames:
+                fingerprint = self.manifest.fingerprint(os.path.join(self.config.cleaned_text_dir, filename))
+                if not self.manifest.is_current(filename, fingerprint):
+                    pending[filename] = fingerprint
+        else:
+            pending = dict.fromkeys(filenames)
+
+        new_fields = self._iter_new_fields(list(pending))
+        for filename in filenames:
+            if filename not in pending:
+                with open(self._record_path(filename), encoding="utf-8") as f:
+                    yield json.load(f), True
+                continue
+
+            fields = next(new_fields)
+            if self.manifest:
+                record_path = self._record_path(filename)
+                with open(record_path, "w", encoding="utf-8") as f:
+                    json.dump(fields, f, ensure_ascii=False)
+                self.manifest.record(filename, pending[filename], [record_path])
+            yield fields, False
+
+    def iter_fields(self):
+        """Field dicts for every cleaned text, NER chunks of all new texts batched through one nlp.pipe stream."""
+        for fields, _ in self._iter_field_records():
+            yield fields
+
+    def extract_fields_from_all(self) -> FieldExtractionArtifact:
         try:
-            all_data = []
-            logging.info(f"📁 Extracting fields from cleaned texts in: {self.config.input_dir}")
+            logging.info(f"📁 Extracting fields from cleaned texts in: {self.config.cleaned_text_dir}")
+            output_json = self.config.output_json_path
+            streaming = self.config.output_format == "jsonl"
+            records = skipped = 0
+
+            # Every record is written as soon as it is produced, so memory does not grow with the corpus.
+            with ExitStack() as stack:
+                jsonfile = stack.enter_context(open(output_json, "w", encoding="utf-8"))
+                if not streaming:
+                    jsonfile.write("[")
+
+                csv_writer = None
+                if self.config.output_csv_path:
+                    csvfile = stack.enter_context(open(self.config.output_csv_path, "w", newline="", encoding="utf-8"))
+                    csv_writer = csv.DictWriter(csvfile, fieldnames=["Filename"] + FIELD_COLUMNS, extrasaction="ignore")
+                    csv_writer.writeheader()
 
-            for filename in os.listdir(self.config.input_dir):
-                if filename.endswith(".txt"):
-                    file_path = os.path.join(self.config.input_dir, filename)
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        text = f.read()
+                parquet_writer = None
+                if self.config.parquet_path:
+                    parquet_writer = ParquetFieldWriter(self.config.parquet_path, self.config.batch_size)
+                    stack.callback(parquet_writer.close)
 
-                    fields = self.extract_fields(text)
-                    fields["Filename"] = filename
-                    fields["Text"] = text
-                    all_data.append(fields)
+                for fields, reused in self._iter_field_records():
+                    if streaming:
+                        jsonfile.write(json.dumps(fields, ensure_ascii=False) + "\n")
+                    else:
+                        jsonfile.write(("," if records else "") + "\n" + json.dumps(fields, indent=2, ensure_ascii=False))
+                    if csv_writer:
+                        csv_writer.writerow(fields)
+                    if parquet_writer:
+                        parquet_writer.write(fields)
 
-                    logging.info(f"✅ Fields extracted from: {filename}")
+                    records += 1
+                    if reused:
+                        skipped += 1
+                    else:
+                        logging.info(f"✅ Fields extracted from: {fields['Filename']}")
 
-            output_json = os.path.join(self.config.output_dir, "extracted_fields_summary.json")
-            with open(output_json, "w", encoding="utf-8") as jsonfile:
-                json.dump(all_data, jsonfile, indent=2, ensure_ascii=False)
+                if not streaming:
+                    jsonfile.write("\n]")
 
-            logging.info(f"📦 Saved all extracted fields to: {output_json}")
+            logging.info(f"📦 Saved {records} extracted field records to: {output_json} ({records - skipped} extracted, {skipped} unchanged)")
+            if self.config.output_csv_path:
+                logging.info(f"📦 Saved field table to: {self.config.output_csv_path}")
+            if self.config.parquet_path:
+                logging.info(f"📦 Saved columnar field table to: {self.config.parquet_path}")
 
-            return DataFeildGetterArtifact(
-                output_json_path=output_json,
-                extracted_data=all_data,
-                status="Success"
+            return FieldExtractionArtifact(
+                json_path=output_json,
+                status="Success",
+                csv_path=self.config.output_csv_path,
+                records=records,
+                documents_processed=records - skipped,
+                documents_skipped=skipped
             )
 
         except Exception as e:
             logging.error("❌ Field extraction failed", exc_info=True)
-            raise CustomException(e)
+            raise MyException(e, sys)
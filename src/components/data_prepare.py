@@ -1,11 +1,16 @@
 import os
-import json
+import sys
 import csv
 import spacy
+from itertools import islice
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from src.logger import logging
 from src.exception import MyException
-from src.entity.config_entity import NERDataPreparerConfig
-from src.entity.artifact_entity import NERDataPreparerArtifact
+from src.components.profiling import trace_document
+from src.components.docbin_corpus import clear_shards, new_doc_bin, shard_path, write_shard
+from src.components.span_alignment import align_values, resolve_overlaps
+from src.entity.config_entity import DataFeildGetterEntity
+from src.entity.artifact_entity import DataFeildGetterArtifact
 
 FIELD_LABELS = {
     "Invoice Number": "INVOICE_NUMBER",
@@ -53,71 +58,150 @@ FIELD_LABELS = {
     "Terms and Conditions": "TERMS_AND_CONDITIONS"
 }
 
+_nlp = None
+
+
+def _tokenizer_nlp():
+    # One blank pipeline per worker process, built on first use.
+    global _nlp
+    if _nlp is None:
+        _nlp = spacy.blank("en")
+    return _nlp
+
+
+def _read_rows(rows, text_dir: str):
+    """(file_name, row, text) for every row whose cleaned text exists."""
+    for row_num, row in rows:
+        file_name = row["Filename"]
+        txt_name = file_name.replace(".pdf", ".txt").replace(".PDF", ".txt")
+        text_path = os.path.join(text_dir, txt_name)
+
+        if not os.path.exists(text_path):
+            logging.warning(f"[{row_num}] Missing file: {text_path}")
+            continue
+
+        with open(text_path, encoding="utf-8") as f:
+            yield file_name, row, f.read()
+
+
+def prepare_shard(task):
+    """
+    Align one chunk of CSV rows and write it as one DocBin shard.
+
+    Returns (records, misaligned, shard path or None when no row produced entities).
+    """
+    index, rows, text_dir, output_dir = task
+    nlp = _tokenizer_nlp()
+    documents = list(_read_rows(rows, text_dir))
+    doc_bin = new_doc_bin()
+    misaligned_count = 0
+
+    docs = nlp.tokenizer.pipe(text for _, _, text in documents)
+    for file_name, row, text in documents:
+        with trace_document("prepare", file_name, shard=index):
+            doc = next(docs)
+            values = []
+            for field, label in FIELD_LABELS.items():
+                value = row.get(field)
+                if value and value.strip() and value != "None":
+                    values.append((value.strip(), label))
+
+            # The same aligner as NERDataCleaner and NERTrainer, so all of them agree on the spans.
+            entities, misaligned, missing = align_values(doc, values)
+            for value, label in misaligned:
+                logging.warning(f"[{file_name}] Misaligned span: '{value}' → '{label}'")
+            for value, label in missing:
+                logging.warning(f"[{file_name}] Value not found: '{value}' → '{label}'")
+            misaligned_count += len(misaligned)
+
+            if entities:
+                # A Doc cannot hold overlapping entities.
+                doc.ents = [doc.char_span(start, end, label=label) for start, end, label in resolve_overlaps(entities)]
+                doc_bin.add(doc)
+                logging.info(f"✅ {file_name}: {len(doc.ents)} entities")
+
+    if not len(doc_bin):
+        return 0, misaligned_count, None
+
+    path = shard_path(output_dir, index)
+    write_shard(doc_bin, path)
+    return len(doc_bin), misaligned_count, path
+
+
+# Shards queued per worker: enough to keep every worker busy, few enough to bound memory.
+SHARDS_IN_FLIGHT_PER_WORKER = 2
+
+
 class NERDataPreparer:
-    def __init__(self, config: NERDataPreparerConfig):
+    def __init__(self, config: DataFeildGetterEntity):
         self.config = config
-        self.nlp = spacy.blank("en")
 
-    def generate_training_data(self) -> NERDataPreparerArtifact:
-        clean_data = []
+    def _tasks(self, reader):
+        """One task per shard_size CSV rows; the chunk index names the shard, which fixes the corpus order."""
+        rows = enumerate(reader, start=1)
+        index = 0
+        while True:
+            chunk = list(islice(rows, self.config.shard_size))
+            if not chunk:
+                return
+            yield index, chunk, self.config.text_dir, self.config.output_corpus
+            index += 1
+
+    def _prepare_parallel(self, tasks):
+        """
+        Results of prepare_shard as they finish, with at most SHARDS_IN_FLIGHT_PER_WORKER shards per
+        worker submitted, so CSV rows are read only as fast as the workers consume them.
+        """
+        window = self.config.num_workers * SHARDS_IN_FLIGHT_PER_WORKER
+        with ProcessPoolExecutor(max_workers=self.config.num_workers) as executor:
+            pending = set()
+            for task in tasks:
+                pending.add(executor.submit(prepare_shard, task))
+                if len(pending) >= window:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            for future in pending:
+                yield future.result()
+
+    def generate_training_data(self) -> DataFeildGetterArtifact:
+        records = 0
         misaligned_count = 0
+        shards = []
 
         try:
             logging.info(f"📄 Reading from CSV: {self.config.csv_file}")
+            clear_shards(self.config.output_corpus)
+
             with open(self.config.csv_file, newline="", encoding="utf-8") as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row_num, row in enumerate(reader, start=1):
-                    file_name = row["Filename"]
-                    txt_name = file_name.replace(".pdf", ".txt").replace(".PDF", ".txt")
-                    text_path = os.path.join(self.config.text_dir, txt_name)
-
-                    if not os.path.exists(text_path):
-                        logging.warning(f"[{row_num}] Missing file: {text_path}")
-                        continue
-
-                    with open(text_path, encoding="utf-8") as f:
-                        text = f.read()
-
-                    doc = self.nlp(text)
-                    valid_entities = []
-
-                    for field, label in FIELD_LABELS.items():
-                        value = row.get(field)
-                        if value and value.strip() and value != "None":
-                            value = value.strip()
-                            start = text.find(value)
-                            if start != -1:
-                                end = start + len(value)
-                                span = doc.char_span(start, end, label=label, alignment_mode="contract")
-                                if span:
-                                    valid_entities.append((span.start_char, span.end_char, label))
-                                else:
-                                    misaligned_count += 1
-                                    logging.warning(f"[{file_name}] Misaligned span: '{value}' → '{label}'")
-                            else:
-                                logging.warning(f"[{file_name}] Value not found: '{value}' → '{label}'")
-
-                    if valid_entities:
-                        clean_data.append((text, {"entities": valid_entities}))
-                        logging.info(f"✅ {file_name}: {len(valid_entities)} entities")
+                tasks = self._tasks(csv.DictReader(csvfile))
 
-        except Exception as e:
-            logging.error("❌ Error during CSV or file reading", exc_info=True)
-            raise CustomException(e)
+                if self.config.num_workers > 1:
+                    logging.info(f"⚙️ Aligning shards of {self.config.shard_size} rows on {self.config.num_workers} workers")
+                    results = self._prepare_parallel(tasks)
+                else:
+                    results = map(prepare_shard, tasks)
 
-        try:
-            with open(self.config.output_json, "w", encoding="utf-8") as out:
-                json.dump(clean_data, out, indent=2, ensure_ascii=False)
+                for shard_records, shard_misaligned, path in results:
+                    records += shard_records
+                    misaligned_count += shard_misaligned
+                    if path:
+                        shards.append(path)
+
+            # Shards finish in any order; their file names carry the CSV order.
+            shards.sort()
 
-            logging.info(f"✅ Training data saved to: {self.config.output_json}")
+            logging.info(f"✅ Training corpus saved to: {self.config.output_corpus} ({records} docs, {len(shards)} shards)")
             logging.info(f"⚠️ Total misaligned spans: {misaligned_count}")
 
-            return NERDataPreparerArtifact(
-                training_data_path=self.config.output_json,
-                num_records=len(clean_data),
-                status="Success"
+            return DataFeildGetterArtifact(
+                output_corpus_path=self.config.output_corpus,
+                total_records=records,
+                misaligned=misaligned_count,
+                status="Success",
+                shards=len(shards)
             )
 
         except Exception as e:
-            logging.error("❌ Failed to write output JSON", exc_info=True)
-            raise CustomException(e)
+            logging.error("❌ Error while building the training corpus", exc_info=True)
+            raise MyException(e, sys)
@@ -1,94 +1,220 @@
+import sys
+import time
+import zlib
+import random
 import spacy
-import json
 from spacy.training import Example
+from itertools import islice
+from spacy.util import minibatch, compounding
 from src.logger import logging
 from src.exception import MyException
+from src.components.data_prepare import FIELD_LABELS
+from src.components.data_feild_extraction import iter_field_records
+from src.components.docbin_corpus import corpus_shards, is_docbin_corpus, iter_corpus_examples
+from src.components.profiling import TraceClock
+from src.components.span_alignment import align_values, resolve_overlaps
 from src.entity.config_entity import NERTrainerConfig
 from src.entity.artifact_entity import NERTrainerArtifact
 
+# Examples held in memory to shuffle a streamed DocBin corpus.
+SHUFFLE_BUFFER = 1000
+# Examples nlp.initialize sees; labels are added beforehand.
+INIT_SAMPLE = 100
+
 
 class NERTrainer:
     def __init__(self, config: NERTrainerConfig):
         self.config = config
         self.nlp = spacy.blank("en")
         self.ner = self.nlp.add_pipe("ner")
+        self.label_mapping = self.config.label_mapping or FIELD_LABELS
 
     def remove_overlapping_entities(self, entities):
-        entities = sorted(entities, key=lambda x: (x[0], -(x[1] - x[0])))
-        result = []
-        occupied = set()
-
-        for start, end, label in entities:
-            if not any(pos in occupied for pos in range(start, end)):
-                result.append((start, end, label))
-                occupied.update(range(start, end))
-        return result
+        return resolve_overlaps(entities)
 
     def load_data(self):
         try:
-            with open(self.config.training_data_path, encoding="utf-8") as f:
-                data = json.load(f)
-
             train_data = []
             label_set = set()
 
-            for row in data:
+            for row in iter_field_records(self.config.training_data_path):
                 text = row.get("Text", "")
                 if not text:
                     continue
 
-                ents = []
-                for field, label in self.config.label_mapping.items():
-                    value = row.get(field)
-                    if value and value.strip():
-                        value = value.strip()
-                        start = text.find(value)
-                        if start != -1:
-                            end = start + len(value)
-                            ents.append((start, end, label))
-
+                doc = self.nlp.make_doc(text)
+                values = [
+                    (row[field].strip(), label) for field, label in self.label_mapping.items()
+                    if row.get(field) and row[field].strip()
+                ]
+                ents, _, _ = align_values(doc, values)
                 ents = self.remove_overlapping_entities(ents)
 
                 if ents:
-                    train_data.append({"text": text, "entities": ents})
+                    train_data.append({"doc": doc, "entities": ents})
                     label_set.update([label for _, _, label in ents])
 
             return train_data, label_set
 
         except Exception as e:
             logging.error("Error loading training data", exc_info=True)
-            raise CustomException(e)
+            raise MyException(e, sys)
+
+    def make_examples(self, train_data):
+        """Build every Example once; tokenisation and gold alignment do not change between epochs."""
+        return [Example.from_dict(sample["doc"], {"entities": sample["entities"]}) for sample in train_data]
+
+    def load_examples(self):
+        """Examples and label set from field records."""
+        train_data, labels = self.load_data()
+        return self.make_examples(train_data), labels
+
+    def _held_out(self, example) -> bool:
+        # Decided per document from its text, so every pass over the corpus splits it the same way.
+        digest = zlib.crc32(f"{self.config.seed}:{example.reference.text}".encode("utf-8"))
+        return digest % 10_000 < self.config.eval_split * 10_000
+
+    def scan_corpus(self):
+        """
+        One streamed pass over a DocBin corpus: (held-out examples, labels, training example
+        count, training words). Only the held-out split is kept in memory.
+        """
+        eval_examples, labels = [], set()
+        train_count = train_words = 0
+        for example in iter_corpus_examples(self.config.training_data_path, self.nlp):
+            labels.update(ent.label_ for ent in example.reference.ents)
+            if self._held_out(example):
+                eval_examples.append(example)
+            else:
+                train_count += 1
+                train_words += len(example.reference)
+        return eval_examples, labels, train_count, train_words
+
+    def stream_corpus(self, rng: random.Random, hold_out: bool = True):
+        """
+        Training examples of a DocBin corpus, read back from the shards on every call.
+
+        Shards come in random order and examples are shuffled through a buffer of
+        SHUFFLE_BUFFER, so an epoch is well mixed without holding the corpus in memory.
+        """
+        shards = corpus_shards(self.config.training_data_path)
+        rng.shuffle(shards)
+        buffer = []
+        for shard in shards:
+            for example in iter_corpus_examples(shard, self.nlp):
+                if hold_out and self._held_out(example):
+                    continue
+                buffer.append(example)
+                if len(buffer) >= SHUFFLE_BUFFER:
+                    i = rng.randrange(len(buffer))
+                    buffer[i], buffer[-1] = buffer[-1], buffer[i]
+                    yield buffer.pop()
+        rng.shuffle(buffer)
+        yield from buffer
+
+    def training_set(self):
+        """
+        (epoch_examples(rng), held-out examples, labels, training example count, words per epoch).
+
+        epoch_examples returns the training examples of one epoch in a fresh random order.
+        """
+        if is_docbin_corpus(self.config.training_data_path):
+            eval_examples, labels, train_count, train_words = self.scan_corpus()
+            hold_out = bool(eval_examples) and train_count > 0
+            if not hold_out:
+                # Too small to split: train on everything without a held-out score, as split_examples does.
+                train_count += len(eval_examples)
+                train_words += sum(len(example.reference) for example in eval_examples)
+                eval_examples = []
+            return lambda rng: self.stream_corpus(rng, hold_out), eval_examples, labels, train_count, train_words
+
+        examples, labels = self.load_examples()
+        train_examples, eval_examples = self.split_examples(examples)
+
+        def epoch_examples(rng):
+            rng.shuffle(train_examples)
+            return train_examples
+
+        words = sum(len(example.reference) for example in train_examples)
+        return epoch_examples, eval_examples, labels, len(train_examples), words
+
+    def split_examples(self, examples):
+        examples = list(examples)
+        random.Random(self.config.seed).shuffle(examples)
+        eval_count = int(len(examples) * self.config.eval_split)
+        if eval_count == 0 or eval_count == len(examples):
+            return examples, []
+        return examples[eval_count:], examples[:eval_count]
 
     def train_and_save(self) -> NERTrainerArtifact:
         try:
-            train_data, labels = self.load_data()
+            epoch_examples, eval_examples, labels, train_count, words_per_epoch = self.training_set()
 
             for label in labels:
                 self.ner.add_label(label)
 
-            logging.info(f"Training on {len(train_data)} samples with {len(labels)} labels.")
+            logging.info(
+                f"Training on {train_count} samples ({len(eval_examples)} held out) "
+                f"with {len(labels)} labels."
+            )
 
             other_pipes = [pipe for pipe in self.nlp.pipe_names if pipe != "ner"]
-            with self.nlp.disable_pipes(*other_pipes):
-                optimizer = self.nlp.begin_training()
+            rng = random.Random(self.config.seed)
+            training_loss = []
+            best_score, best_epoch = None, 0
+
+            with self.nlp.select_pipes(disable=other_pipes):
+                # Labels are already added, so initialisation only needs a sample of the data.
+                optimizer = self.nlp.initialize(lambda: islice(epoch_examples(random.Random(self.config.seed)), INIT_SAMPLE))
+
+                clock = TraceClock()
                 for itn in range(self.config.num_iterations):
+                    clock.reset()
+                    start = time.perf_counter()
                     losses = {}
-                    logging.info(f"📦 Iteration {itn + 1}")
-                    for example in train_data:
-                        doc = self.nlp.make_doc(example["text"])
-                        ex = Example.from_dict(doc, {"entities": example["entities"]})
-                        self.nlp.update([ex], drop=self.config.dropout, sgd=optimizer, losses=losses)
-                    logging.info(f"Loss: {losses}")
-
-            self.nlp.to_disk(self.config.output_model_dir)
-            logging.info(f"✅ Model saved to: {self.config.output_model_dir}")
+                    batch_sizes = compounding(self.config.batch_start, self.config.batch_stop, self.config.batch_compound)
+                    for batch in minibatch(epoch_examples(rng), size=batch_sizes):
+                        self.nlp.update(batch, drop=self.config.dropout, sgd=optimizer, losses=losses)
+                    seconds = time.perf_counter() - start
+
+                    epoch = {
+                        "epoch": itn + 1,
+                        "loss": float(losses.get("ner", 0.0)),
+                        "seconds": seconds,
+                        "words_per_second": words_per_epoch / seconds if seconds else 0.0,
+                    }
+
+                    if eval_examples:
+                        with self.nlp.use_params(optimizer.averages):
+                            epoch["ents_f"] = float(self.nlp.evaluate(eval_examples)["ents_f"] or 0.0)
+                            if best_score is None or epoch["ents_f"] > best_score:
+                                best_score, best_epoch = epoch["ents_f"], itn + 1
+                                self.nlp.to_disk(self.config.model_output_dir)
+
+                    training_loss.append(epoch)
+                    clock.record("train", f"epoch {itn + 1}", examples=train_count, loss=epoch["loss"])
+                    logging.info(f"📦 Iteration {itn + 1}: {epoch}")
+
+                    if best_score is not None and itn + 1 - best_epoch >= self.config.patience:
+                        logging.info(f"⏹️ No improvement for {self.config.patience} epochs, stopping early")
+                        break
+
+                # Without a held-out set, or when no epoch ever scored above 0, there is no better checkpoint than the last.
+                if not best_score:
+                    with self.nlp.use_params(optimizer.averages):
+                        self.nlp.to_disk(self.config.model_output_dir)
+
+            if best_score is not None:
+                logging.info(f"🏅 Best held-out F-score {best_score:.3f} at epoch {best_epoch}")
+            logging.info(f"✅ Model saved to: {self.config.model_output_dir}")
 
             return NERTrainerArtifact(
-                model_path=self.config.output_model_dir,
-                labels=list(labels),
-                status="Success"
+                model_path=self.config.model_output_dir,
+                training_loss=training_loss,
+                status="Success",
+                best_score=best_score
             )
 
         except Exception as e:
             logging.error("Training failed", exc_info=True)
-            raise CustomException(e)
+            raise MyException(e, sys)
@@ -1,70 +1,64 @@
+import sys
 import spacy
-import json
-from spacy.training import offsets_to_biluo_tags, Example
 from src.logger import logging
 from src.exception import   MyException
-from src.entity.config_entity import NERDataCleanerConfig
-from src.entity.artifact_entity import NERDataCleanerArtifact
+from src.components.data_feild_extraction import iter_field_records
+from src.components.docbin_corpus import DocBinShardWriter
+from src.components.span_alignment import align_values, has_overlaps
+from src.entity.config_entity import TrainingDataValidatorConfig
+from src.entity.artifact_entity import TrainingValidatorArtifact
 
 class NERDataCleaner:
-    def __init__(self, config: NERDataCleanerConfig):
+    def __init__(self, config: TrainingDataValidatorConfig):
         self.config = config
         self.nlp = spacy.blank("en")
 
-    def clean_data(self) -> NERDataCleanerArtifact:
+    def clean_data(self) -> TrainingValidatorArtifact:
         try:
-            with open(self.config.input_json, encoding="utf-8") as f:
-                data = json.load(f)
+            logging.info(f"🔍 Validating raw NER records from: {self.config.input_json}")
 
-            total = len(data)
-            logging.info(f"🔍 Loaded {total} raw NER records for validation")
-
-            clean_data = []
+            total = 0
+            valid = 0
             misaligned = 0
             conflicting = 0
 
-            for i, item in enumerate(data):
-                text = item.get("Text", "")
-                doc = self.nlp.make_doc(text)
+            # Records are read one at a time and validated Docs are flushed to disk shard by shard.
+            with DocBinShardWriter(self.config.output_corpus, self.config.shard_size) as writer:
+                for i, item in enumerate(iter_field_records(self.config.input_json)):
+                    total += 1
+                    text = item.get("Text", "")
+                    doc = self.nlp.make_doc(text)
+
+                    values = [
+                        (value.strip(), key.upper()) for key, value in item.items()
+                        if key not in ["Filename", "Text"] and value and value != "None" and value.strip()
+                    ]
+                    entities, misaligned_values, _ = align_values(doc, values)
 
-                entities = []
-                for key, value in item.items():
-                    if key in ["Filename", "Text"] or not value or value == "None":
+                    if has_overlaps(entities):
+                        logging.warning(f"❌ Conflict in example {i}: overlapping entities")
+                        conflicting += 1
                         continue
-                    value = value.strip()
-                    start = text.find(value)
-                    if start != -1:
-                        end = start + len(value)
-                        entities.append((start, end, key.upper()))
 
-                try:
-                    tags = offsets_to_biluo_tags(doc, entities)
-                    if "-" in tags:
+                    if misaligned_values:
                         logging.warning(f"⚠️ Misaligned entity at index {i}")
                         misaligned += 1
                         continue
 
-                    Example.from_dict(doc, {"entities": entities})
-                    clean_data.append((text, {"entities": entities}))
-
-                except ValueError as e:
-                    logging.warning(f"❌ Conflict in example {i}: {e}")
-                    conflicting += 1
-
-            with open(self.config.output_json, "w", encoding="utf-8") as f:
-                json.dump(clean_data, f, indent=2, ensure_ascii=False)
+                    doc.ents = [doc.char_span(start, end, label=label) for start, end, label in entities]
+                    writer.add(doc)
+                    valid += 1
 
-            logging.info(f"✅ Cleaned data saved to: {self.config.output_json}")
-            logging.info(f"📊 Summary - Total: {total}, Clean: {len(clean_data)}, Misaligned: {misaligned}, Conflicting: {conflicting}")
+            logging.info(f"✅ Cleaned corpus saved to: {self.config.output_corpus}")
+            logging.info(f"📊 Summary - Total: {total}, Clean: {valid}, Misaligned: {misaligned}, Conflicting: {conflicting}")
 
-            return NERDataCleanerArtifact(
-                cleaned_data_path=self.config.output_json,
-                clean_count=len(clean_data),
+            return TrainingValidatorArtifact(
+                cleaned_data_path=self.config.output_corpus,
+                valid_count=valid,
                 misaligned_count=misaligned,
-                conflict_count=conflicting,
-                status="Success"
+                conflicting_count=conflicting
             )
 
         except Exception as e:
             logging.error("❌ Error in NERDataCleaner", exc_info=True)
-            raise CustomException(e)
+            raise MyException(e, sys)
@@ -0,0 +1,98 @@
+import os
+import glob
+from typing import Iterator, List
+from spacy.tokens import Doc, DocBin
+from spacy.training import Corpus, Example
+from src.logger import logging
+
+SHARD_SUFFIX = ".spacy"
+# Tokens, their trailing spaces (always stored) and the entity annotation; nothing else is needed to train NER.
+DOCBIN_ATTRS = ["ORTH", "ENT_IOB", "ENT_TYPE"]
+
+
+def new_doc_bin() -> DocBin:
+    return DocBin(attrs=DOCBIN_ATTRS)
+
+
+def shard_path(output_dir: str, index: int) -> str:
+    return os.path.join(output_dir, f"shard_{index:05d}{SHARD_SUFFIX}")
+
+
+def write_shard(doc_bin: DocBin, path: str):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(doc_bin.to_bytes())
+    os.replace(tmp_path, path)
+
+
+def clear_shards(output_dir: str):
+    os.makedirs(output_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(output_dir, f"*{SHARD_SUFFIX}")):
+        os.remove(path)
+
+
+class DocBinShardWriter:
+    """
+    Writes annotated Docs as numbered DocBin shards, flushing every `shard_size` docs.
+
+    Shards from an earlier run are removed on open so a smaller corpus never mixes with
+    stale files. Each shard is written under a temporary name and renamed into place.
+    """
+
+    def __init__(self, output_dir: str, shard_size: int = 1000):
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+        self.paths: List[str] = []
+        self.docs = 0
+        self._bin = new_doc_bin()
+        clear_shards(self.output_dir)
+
+    def add(self, doc: Doc):
+        self._bin.add(doc)
+        self.docs += 1
+        if len(self._bin) >= self.shard_size:
+            self._flush()
+
+    def _flush(self):
+        if not len(self._bin):
+            return
+        path = shard_path(self.output_dir, len(self.paths))
+        write_shard(self._bin, path)
+        self.paths.append(path)
+        self._bin = new_doc_bin()
+
+    def close(self) -> List[str]:
+        self._flush()
+        logging.info(f"💾 {self.docs} docs written to {len(self.paths)} shards in {self.output_dir}")
+        return self.paths
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+
+def is_docbin_corpus(path: str) -> bool:
+    """True for a .spacy file or a directory holding .spacy shards."""
+    if os.path.isdir(path):
+        return bool(glob.glob(os.path.join(path, f"*{SHARD_SUFFIX}")))
+    return path.endswith(SHARD_SUFFIX)
+
+
+def corpus_shards(path: str) -> List[str]:
+    """The .spacy files of a corpus: the shards of a directory in order, or the file itself."""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, f"*{SHARD_SUFFIX}")))
+    return [path]
+
+
+def iter_corpus_examples(path: str, nlp) -> Iterator[Example]:
+    """
+    Lazily yield training Examples from a DocBin corpus, one shard at a time.
+
+    gold_preproc reuses the stored tokens for the predicted side, so nothing is tokenised
+    again; the corpus must have been built with the same tokenizer as `nlp`.
+    """
+    yield from Corpus(path, gold_preproc=True)(nlp)
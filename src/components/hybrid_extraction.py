@@ -0,0 +1,115 @@
+import re
+import unicodedata
+from typing import List, Optional, Tuple
+import pdfplumber
+from src.logger import logging
+from src.components.ocr_backend import OCRBackend, PytesseractBackend
+from src.components.ocr_preprocess import ocr_preprocessed
+from src.entity.config_entity import HybridExtractionConfig
+
+CID_PATTERN = re.compile(r"\(cid:\d+\)")
+GARBAGE_CATEGORIES = {"Cc", "Cf", "Co", "Cn", "Cs"}
+
+
+def garbage_ratio(text: str) -> float:
+    """Share of non-whitespace characters that are unmapped glyphs, control or private-use codepoints."""
+    cid_chars = sum(len(m) for m in CID_PATTERN.findall(text))
+    visible = "".join(CID_PATTERN.sub("", text).split())
+    total = len(visible) + cid_chars
+    if total == 0:
+        return 1.0
+
+    bad = sum(1 for c in visible if c == "�" or unicodedata.category(c) in GARBAGE_CATEGORIES)
+    return (bad + cid_chars) / total
+
+
+class HybridTextExtractor:
+    """Reads the native PDF text layer page by page and only OCRs pages where it is missing or unusable."""
+
+    def __init__(self, config: Optional[HybridExtractionConfig] = None, backend: Optional[OCRBackend] = None):
+        self.config = config or HybridExtractionConfig()
+        self.backend = backend or PytesseractBackend()
+
+    def needs_ocr(self, text: Optional[str]) -> bool:
+        if not self.config.text_layer_first or not text:
+            return True
+        if len("".join(text.split())) < self.config.min_chars:
+            return True
+        return garbage_ratio(text) > self.config.max_garbage_ratio
+
+    def read_pages(self, source) -> List[Tuple[Tuple[float, float], Optional[str]]]:
+        """(width, height) in points and text layer for every page; text is None when text_layer_first is off."""
+        pages = []
+        with pdfplumber.open(source) as pdf:
+            for page in pdf.pages:
+                text = (page.extract_text() or "") if self.config.text_layer_first else None
+                pages.append(((page.width, page.height), text))
+                page.close()
+        return pages
+
+    def read_page(self, source, page_number: int) -> str:
+        with pdfplumber.open(source, pages=[page_number]) as pdf:
+            return pdf.pages[0].extract_text() or ""
+
+    def first_pass_dpi(self) -> int:
+        """Resolution pages are rasterized at for OCR; with preprocessing they start lower and are retried at dpi."""
+        preprocess = self.config.preprocess
+        return min(preprocess.target_dpi, self.config.dpi) if preprocess else self.config.dpi
+
+    def ocr_page(self, image, dpi: Optional[float] = None, render=None) -> str:
+        """
+        OCR a page image rasterized (or scanned) at `dpi`.
+
+        With preprocessing on, a page read with low confidence is tried once more at full
+        resolution: rendered again at config.dpi by render(dpi) when it was rasterized
+        lower, or preprocessed without downscaling. The more confident reading wins.
+        """
+        preprocess = self.config.preprocess
+        if preprocess is None:
+            return self.backend.image_to_string(image, self.config.lang)
+
+        text, confidence, downscaled = ocr_preprocessed(image, preprocess, self.backend, self.config.lang, dpi)
+        if confidence >= preprocess.min_confidence:
+            return text
+
+        if render is not None and dpi and dpi < self.config.dpi:
+            retry_image = render(self.config.dpi)
+            try:
+                retry_text, retry_confidence, _ = ocr_preprocessed(
+                    retry_image, preprocess, self.backend, self.config.lang, self.config.dpi, downscale=False
+                )
+            finally:
+                retry_image.close()
+        elif downscaled:
+            retry_text, retry_confidence, _ = ocr_preprocessed(
+                image, preprocess, self.backend, self.config.lang, dpi, downscale=False
+            )
+        else:
+            return text
+
+        logging.info(f"🔁 Low OCR confidence ({confidence:.0f}), retried at full resolution ({retry_confidence:.0f})")
+        return retry_text if retry_confidence > confidence else text
+
+    def ocr_image(self, image) -> str:
+        dpi = image.info.get("dpi", (None,))[0]
+        return self.ocr_page(image, dpi)
+
+    def extract_pdf(self, source) -> List[str]:
+        """Per-page text of a PDF path or file object, OCRing only the pages that need it."""
+        texts = []
+        ocr_pages = 0
+        with pdfplumber.open(source) as pdf:
+            for page in pdf.pages:
+                text = (page.extract_text() or "") if self.config.text_layer_first else None
+                if self.needs_ocr(text):
+                    dpi = self.first_pass_dpi()
+                    text = self.ocr_page(
+                        page.to_image(resolution=dpi).original, dpi,
+                        lambda retry_dpi, page=page: page.to_image(resolution=retry_dpi).original
+                    )
+                    ocr_pages += 1
+                texts.append(text)
+                page.close()
+
+        logging.info(f"📑 {len(texts)} pages read, {ocr_pages} via OCR")
+        return texts
@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+from src.logger import logging
+from src.entity.config_entity import JobQueueConfig
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+# Set on jobs whose process died before finishing them; their inputs died with it, so they cannot be rerun.
+ORPHANED_ERROR = "interrupted: the server process running this job exited"
+
+
+def process_alive(pid: int) -> bool:
+    """Whether a process with this pid exists (signal 0 checks without delivering anything)."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class QueueFullError(Exception):
+    """Raised by JobQueue.submit when every worker is busy and the pending queue is full."""
+
+
+@dataclass
+class Job:
+    id: str
+    status: str = QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """
+    In-process job queue: a fixed pool of worker threads plus a bounded number of waiting jobs.
+
+    submit() never blocks. Once max_workers jobs are running and max_pending are waiting it
+    raises QueueFullError, which the web layer turns into a 429. Finished jobs are kept for
+    result_ttl_seconds so clients can collect their results, then handed to on_expire and
+    forgotten.
+
+    With store_path set, job state is also written to a SQLite file so that any process
+    sharing it can answer status and result requests, while each job still runs in the
+    process that accepted it. Jobs a dead process left queued or running are marked failed
+    when a queue opens the store, so clients polling them get an answer.
+    """
+
+    def __init__(self, config: Optional[JobQueueConfig] = None, on_expire: Optional[Callable[[Job], None]] = None):
+        self.config = config or JobQueueConfig()
+        self.on_expire = on_expire
+        self._executor = ThreadPoolExecutor(max_workers=self.config.max_workers, thread_name_prefix="smartdoc-job")
+        self._slots = threading.BoundedSemaphore(self.config.max_workers + self.config.max_pending)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.rejected = 0
+        if self.config.store_path:
+            with self._connect() as db:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, status TEXT, submitted_at REAL, "
+                    "started_at REAL, finished_at REAL, result TEXT, error TEXT, pid INTEGER)"
+                )
+                if "pid" not in {row[1] for row in db.execute("PRAGMA table_info(jobs)")}:
+                    db.execute("ALTER TABLE jobs ADD COLUMN pid INTEGER")
+            self.reap_orphans()
+
+    def _connect(self):
+        # One short-lived connection per call: cheap for SQLite and safe from any thread or forked worker.
+        return sqlite3.connect(self.config.store_path, timeout=10)
+
+    def reap_orphans(self):
+        """Fail stored jobs left queued or running by processes that no longer exist."""
+        if not self.config.store_path:
+            return
+        # This process has not run anything yet, so its own pid (reused from a dead worker) counts as gone too.
+        with self._connect() as db:
+            rows = db.execute("SELECT id, pid FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)).fetchall()
+            orphans = [job_id for job_id, pid in rows if pid is None or pid == os.getpid() or not process_alive(pid)]
+            db.executemany(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                [(FAILED, time.time(), ORPHANED_ERROR, job_id) for job_id in orphans]
+            )
+        if orphans:
+            logging.warning(f"⚠️ Marked {len(orphans)} jobs of exited processes as failed")
+
+    def _save(self, job: Job):
+        if not self.config.store_path:
+            return
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.status, job.submitted_at, job.started_at, job.finished_at,
+                 json.dumps(job.result, ensure_ascii=False), job.error, os.getpid())
+            )
+
+    def _load(self, job_id: str) -> Optional[Job]:
+        if not self.config.store_path:
+            return None
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = Job(*row[:5], result=json.loads(row[5]), error=row[6])
+        if job.finished:
+            job.done.set()
+        return job
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Job:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise QueueFullError(f"{self.config.max_workers + self.config.max_pending} jobs already queued or running")
+
+        job = Job(id=uuid.uuid4().hex)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._save(job)
+
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        logging.info(f"📥 Job {job.id} queued")
+        return job
+
+    def _run(self, job: Job, fn: Callable, args, kwargs):
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._save(job)
+        status = FAILED
+        try:
+            job.result = fn(*args, **kwargs)
+            status = DONE
+            logging.info(f"✅ Job {job.id} done in {time.time() - job.started_at:.2f}s")
+        except Exception as e:
+            job.error = str(e)
+            logging.error(f"❌ Job {job.id} failed", exc_info=True)
+        finally:
+            # finished_at first: _prune treats a finished status as a promise that it is set.
+            job.finished_at = time.time()
+            job.status = status
+            try:
+                self._save(job)
+            except Exception:
+                logging.error(f"❌ Could not store result of job {job.id}", exc_info=True)
+            self._slots.release()
+            job.done.set()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """A job submitted to this queue, or, with a store, to any queue sharing it (e.g. another worker process)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job if job is not None else self._load(job_id)
+
+    def _prune(self):
+        cutoff = time.time() - self.config.result_ttl_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            if self.on_expire:
+                try:
+                    self.on_expire(job)
+                except Exception:
+                    logging.warning(f"⚠️ Cleanup of expired job {job_id} failed", exc_info=True)
+
+        if self.config.store_path:
+            with self._connect() as db:
+                db.execute("DELETE FROM jobs WHERE finished_at < ?", (cutoff,))
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            return {
+                "queued": statuses.count(QUEUED),
+                "running": statuses.count(RUNNING),
+                "done": statuses.count(DONE),
+                "failed": statuses.count(FAILED),
+                "rejected": self.rejected,
+                "capacity": self.config.max_workers + self.config.max_pending,
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,287 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from src.logger import logging
+from src.components.job_queue import process_alive
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            samples = [[list(key), list(value) if isinstance(value, list) else value] for key, value in self._values.items()]
+        return {"kind": self.kind, "help": self.documentation, "labelnames": list(self.labelnames), "samples": samples}
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            # [per-bucket counts..., sum, count]; buckets are made cumulative when rendered.
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict:
+        snapshot = super().snapshot()
+        snapshot["buckets"] = list(self.buckets[:-1])
+        return snapshot
+
+
+class PhaseTimer:
+    """
+    Times the phases of one piece of work and records them in a histogram at the end.
+
+    Recording is deferred so that labels only known late (e.g. a document's page count)
+    apply to every phase. The in-flight gauge is live, labelled by phase only.
+    """
+
+    def __init__(self, histogram: Histogram, in_flight: Optional[Gauge] = None):
+        self.histogram = histogram
+        self.in_flight = in_flight
+        self.timings = []
+
+    @contextmanager
+    def phase(self, name: str):
+        if self.in_flight:
+            self.in_flight.inc(phase=name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.append((name, time.perf_counter() - start))
+            if self.in_flight:
+                self.in_flight.dec(phase=name)
+
+    def record(self, name: str, seconds: float):
+        self.timings.append((name, seconds))
+
+    def observe(self, **labels):
+        for name, seconds in self.timings:
+            self.histogram.observe(seconds, phase=name, **labels)
+        self.timings = []
+
+
+class MetricsRegistry:
+    """
+    Metrics of one process, rendered in the Prometheus text exposition format.
+
+    With shared_dir set, every process writes a snapshot of its metrics there every
+    flush_seconds, and render() adds up the snapshots of all processes, so a scrape of any
+    gunicorn worker reports the whole server. Gauges of processes that are gone are
+    dropped; their counters and histograms keep counting.
+    """
+
+    def __init__(self, shared_dir: Optional[str] = None, flush_seconds: float = 5.0):
+        self.shared_dir = shared_dir
+        self.flush_seconds = flush_seconds
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._flusher_pid = None
+        self._lock = threading.Lock()
+        if shared_dir:
+            os.makedirs(shared_dir, exist_ok=True)
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collect: Callable[[], None]):
+        """Called before every snapshot, e.g. to copy queue or cache stats into gauges."""
+        self._collectors.append(collect)
+
+    def snapshot(self) -> Dict:
+        for collect in self._collectors:
+            try:
+                collect()
+            except Exception:
+                logging.warning("⚠️ Metrics collector failed", exc_info=True)
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    # -- cross-process sharing --
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.shared_dir, f"{pid}.json")
+
+    def flush(self):
+        path = self._path(os.getpid())
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def start(self):
+        """Start publishing snapshots from this process; a no-op without shared_dir or if already running here."""
+        if not self.shared_dir:
+            return
+        with self._lock:
+            # Threads do not survive fork, so a worker forked from a preloaded master starts its own.
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name="smartdoc-metrics", daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            try:
+                self.flush()
+            except Exception:
+                logging.warning("⚠️ Could not publish metrics snapshot", exc_info=True)
+            time.sleep(self.flush_seconds)
+
+    def _peer_snapshots(self):
+        for entry in os.scandir(self.shared_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                pid = int(entry.name[:-5])
+                if pid == os.getpid():
+                    continue
+                with open(entry.path, encoding="utf-8") as f:
+                    yield process_alive(pid), json.load(f)
+            except (OSError, ValueError):
+                continue
+
+    def collect(self) -> Dict:
+        """Snapshot of this process, plus every other process sharing shared_dir."""
+        merged = self.snapshot()
+        if not self.shared_dir:
+            return merged
+
+        for alive, snapshot in self._peer_snapshots():
+            for name, metric in snapshot.items():
+                if metric["kind"] == "gauge" and not alive:
+                    continue
+                target = merged.setdefault(name, dict(metric, samples=[]))
+                _merge_samples(target, metric)
+        return merged
+
+    def render(self) -> str:
+        lines = []
+        for name, metric in sorted(self.collect().items()):
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['kind']}")
+            labelnames = metric["labelnames"]
+            for key, value in sorted(metric["samples"], key=lambda sample: sample[0]):
+                if metric["kind"] != "histogram":
+                    lines.append(f"{name}{_format_labels(labelnames, key)} {_format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric["buckets"] + [float("inf")], value[:-2]):
+                    cumulative += count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{name}_bucket{_format_labels(labelnames, key, le)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labelnames, key)} {_format_value(value[-2])}")
+                lines.append(f"{name}_count{_format_labels(labelnames, key)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+def _merge_samples(target: Dict, metric: Dict):
+    samples = {tuple(key): value for key, value in target["samples"]}
+    for key, value in metric["samples"]:
+        key = tuple(key)
+        if key not in samples:
+            samples[key] = value
+        elif metric["kind"] == "histogram":
+            samples[key] = [a + b for a, b in zip(samples[key], value)]
+        else:
+            samples[key] = samples[key] + value
+    target["samples"] = [[list(key), value] for key, value in samples.items()]
@@ -0,0 +1,203 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Optional, Tuple
+import pytesseract
+from src.logger import logging
+from src.components.ocr_cache import tesseract_version
+
+BACKENDS = ("auto", "tesserocr", "pytesseract")
+
+
+class OCRBackend:
+    """Turns a PIL image into text. Implementations must be safe to call from several threads."""
+
+    name = "base"
+
+    @property
+    def version(self) -> str:
+        """Engine name and version, part of cache keys since engines can read the same page differently."""
+        raise NotImplementedError
+
+    def image_to_string(self, image, lang: str) -> str:
+        raise NotImplementedError
+
+    def image_to_text_and_confidence(self, image, lang: str) -> Tuple[str, float]:
+        """Text plus the mean word confidence (0-100); a page without any recognised word scores 0."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PytesseractBackend(OCRBackend):
+    """One tesseract subprocess per call, with the image passed through a temp file. Always available."""
+
+    name = "pytesseract"
+
+    @property
+    def version(self) -> str:
+        return f"pytesseract-{tesseract_version()}"
+
+    def image_to_string(self, image, lang: str) -> str:
+        return pytesseract.image_to_string(image, lang=lang)
+
+    def image_to_text_and_confidence(self, image, lang: str) -> Tuple[str, float]:
+        # txt and tsv from a single tesseract run.
+        text, tsv = pytesseract.run_and_get_multiple_output(image, extensions=["txt", "tsv"], lang=lang)
+        confidences = []
+        for row in tsv.splitlines()[1:]:
+            fields = row.split("\t")
+            if len(fields) == 12 and fields[11].strip():
+                confidence = float(fields[10])
+                if confidence >= 0:
+                    confidences.append(confidence)
+        return text, (sum(confidences) / len(confidences) if confidences else 0.0)
+
+
+class TesserocrPool(OCRBackend):
+    """
+    Up to `size` long-lived Tesseract engines (tesserocr) shared by all threads of a process.
+
+    Engines are created on first use, so a pool built before a fork (gunicorn --preload)
+    holds nothing that the workers would share. Each keeps its language model loaded and
+    reads images straight from memory; recognition releases the GIL, so threads OCR in
+    parallel. An idle engine for another language is shut down to make room when needed.
+
+    With a fallback backend, a failure to start an engine (e.g. no tessdata for the
+    language) sends that call and every later one to the fallback instead.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, size: int = 1, tessdata_path: Optional[str] = None, fallback: Optional[OCRBackend] = None):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self.size = max(1, size)
+        self.tessdata_path = tessdata_path
+        self.fallback = fallback
+        self.failed = False
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._idle = []  # (lang, engine)
+        self._engines = 0
+
+    @property
+    def version(self) -> str:
+        if self.failed:
+            return self.fallback.version
+        return f"tesserocr-{self._tesserocr.tesseract_version().split()[1]}"
+
+    def _new_engine(self, lang: str):
+        if self.tessdata_path:
+            return self._tesserocr.PyTessBaseAPI(path=self.tessdata_path, lang=lang)
+        return self._tesserocr.PyTessBaseAPI(lang=lang)
+
+    def _take(self, lang: str):
+        with self._lock:
+            for i, (idle_lang, engine) in enumerate(self._idle):
+                if idle_lang == lang:
+                    del self._idle[i]
+                    return engine
+            # A slot is held, so with no idle engine for this language any idle engine is surplus.
+            if self._engines >= self.size and self._idle:
+                _, stale = self._idle.pop(0)
+                stale.End()
+                self._engines -= 1
+            self._engines += 1
+        try:
+            return self._new_engine(lang)
+        except Exception:
+            with self._lock:
+                self._engines -= 1
+            raise
+
+    @contextmanager
+    def _engine(self, lang: str):
+        self._slots.acquire()
+        try:
+            try:
+                engine = self._take(lang)
+            except RuntimeError:
+                if self.fallback is None:
+                    raise
+                if not self.failed:
+                    logging.warning(f"⚠️ tesserocr engine for {lang!r} failed to start, falling back to {self.fallback.name}", exc_info=True)
+                    self.failed = True
+                yield None
+                return
+            try:
+                yield engine
+            finally:
+                engine.Clear()
+                with self._lock:
+                    self._idle.append((lang, engine))
+        finally:
+            self._slots.release()
+
+    def image_to_string(self, image, lang: str) -> str:
+        if self.failed:
+            return self.fallback.image_to_string(image, lang)
+        with self._engine(lang) as engine:
+            if engine is None:
+                return self.fallback.image_to_string(image, lang)
+            engine.SetImage(image)
+            return engine.GetUTF8Text()
+
+    def image_to_text_and_confidence(self, image, lang: str) -> Tuple[str, float]:
+        if self.failed:
+            return self.fallback.image_to_text_and_confidence(image, lang)
+        with self._engine(lang) as engine:
+            if engine is None:
+                return self.fallback.image_to_text_and_confidence(image, lang)
+            engine.SetImage(image)
+            text = engine.GetUTF8Text()
+            confidences = engine.AllWordConfidences()
+        return text, (sum(confidences) / len(confidences) if confidences else 0.0)
+
+    def close(self):
+        with self._lock:
+            for _, engine in self._idle:
+                engine.End()
+            self._engines -= len(self._idle)
+            self._idle = []
+
+
+def _tessdata_path() -> Optional[str]:
+    # Next to a configured tesseract executable (the Windows installer layout); otherwise tesserocr's default.
+    path = os.path.join(os.path.dirname(pytesseract.pytesseract.tesseract_cmd), "tessdata")
+    return path if os.path.isdir(path) else None
+
+
+def create_backend(name: str = "auto", pool_size: int = 1) -> OCRBackend:
+    """
+    "tesserocr" for a persistent engine pool, "pytesseract" for a subprocess per call, or
+    "auto" for the pool when tesserocr is installed and pytesseract otherwise.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown OCR backend {name!r}, expected one of {BACKENDS}")
+
+    if name in ("auto", "tesserocr"):
+        try:
+            backend = TesserocrPool(pool_size, _tessdata_path(), PytesseractBackend() if name == "auto" else None)
+            logging.info(f"🔤 OCR backend: tesserocr pool of {backend.size} engines")
+            return backend
+        except ImportError as e:
+            if name == "tesserocr":
+                raise ImportError("ocr_backend='tesserocr' requires tesserocr: pip install tesserocr") from e
+
+    logging.info("🔤 OCR backend: pytesseract")
+    return PytesseractBackend()
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name: str = "auto", pool_size: int = 1) -> OCRBackend:
+    """Process-wide backend for (name, pool_size), created on first request."""
+    key = (name, pool_size, os.getpid())
+    with _backends_lock:
+        if key not in _backends:
+            _backends[key] = create_backend(name, pool_size)
+        return _backends[key]
@@ -0,0 +1,157 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+import pytesseract
+from src.logger import logging
+from src.entity.config_entity import OCRCacheConfig
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@lru_cache(maxsize=1)
+def tesseract_version() -> str:
+    try:
+        return str(pytesseract.get_tesseract_version())
+    except Exception:
+        return "unknown"
+
+
+def content_hash(source) -> str:
+    """SHA-256 of a file path or binary file object; file objects are rewound afterwards."""
+    digest = hashlib.sha256()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    else:
+        position = source.tell()
+        for chunk in iter(lambda: source.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+        source.seek(position)
+    return digest.hexdigest()
+
+
+class OCRCache:
+    """
+    Content-addressed cache of per-page OCR text: an optional memory tier in front of a
+    size-bounded disk LRU. With cache_dir set to None only the memory tier is used.
+    """
+
+    def __init__(self, config: OCRCacheConfig):
+        self.config = config
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        if self.config.cache_dir:
+            os.makedirs(self.config.cache_dir, exist_ok=True)
+            for entry in sorted(os.scandir(self.config.cache_dir), key=lambda e: e.stat().st_mtime):
+                if entry.name.endswith(".json"):
+                    self._entries[entry.name[:-5]] = entry.stat().st_size
+        self._bytes = sum(self._entries.values())
+        logging.info(f"🗃️ {type(self).__name__} at {self.config.cache_dir}: {len(self._entries)} entries, {self._bytes} bytes")
+
+    def make_key(self, source, **params) -> str:
+        """Key from the file content plus every OCR parameter that can change the output."""
+        params["tesseract"] = tesseract_version()
+        payload = json.dumps({"content": content_hash(source), "params": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.config.cache_dir, f"{key}.json")
+
+    def _remember(self, key: str, pages, size: int):
+        if self.config.memory_items <= 0:
+            return
+        self._forget(key)
+        self._memory[key] = (pages, size)
+        self._memory_bytes += size
+        while len(self._memory) > self.config.memory_items:
+            self._forget(next(iter(self._memory)))
+
+    def _forget(self, key: str):
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry[1]
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key][0]
+
+            if key not in self._entries:
+                # Another process sharing the directory (a gunicorn worker, another pod) may have written it since startup.
+                try:
+                    size = os.path.getsize(self._path(key)) if self.config.cache_dir else None
+                except OSError:
+                    size = None
+                if size is None:
+                    self.misses += 1
+                    return None
+                self._entries[key] = size
+                self._bytes += size
+
+            try:
+                with open(self._path(key), encoding="utf-8") as f:
+                    pages = json.load(f)
+                os.utime(self._path(key))
+            except (OSError, ValueError):
+                self._bytes -= self._entries.pop(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.disk_hits += 1
+            self._remember(key, pages, self._entries[key])
+            return pages
+
+    def put(self, key: str, pages):
+        data = json.dumps(pages, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            self._remember(key, pages, len(data))
+            if not self.config.cache_dir:
+                return
+
+            # Write-then-rename so concurrent readers (other workers, other pods on a shared volume) never see half a file.
+            fd, tmp_path = tempfile.mkstemp(dir=self.config.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+
+            self._bytes += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._evict()
+
+    def _evict(self):
+        while self._bytes > self.config.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._forget(key)
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+            }
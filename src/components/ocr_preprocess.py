@@ -0,0 +1,132 @@
+from typing import Optional, Tuple
+import numpy as np
+from PIL import Image
+from src.components.ocr_backend import OCRBackend
+from src.entity.config_entity import OCRPreprocessConfig
+
+# Deskew search: coarse steps over the whole range, then fine steps around the best coarse angle.
+SKEW_COARSE_STEP = 1.0
+SKEW_FINE_STEP = 0.1
+SKEW_MIN_DEGREES = 0.2
+SKEW_THUMBNAIL = 800  # longest side of the image the skew is measured on
+
+
+def otsu_threshold(pixels: np.ndarray) -> int:
+    """Grey level that best separates ink from paper (Otsu's method)."""
+    histogram = np.bincount(pixels.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight = np.cumsum(histogram)
+    total = weight[-1]
+    mean = np.cumsum(histogram * levels)
+    background = total - weight
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = (mean[-1] * weight - mean * total) ** 2 / (weight * background)
+    variance[~np.isfinite(variance)] = 0
+    return int(np.argmax(variance)) + 1
+
+
+def _resize(image: Image.Image, scale: float) -> Image.Image:
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.LANCZOS)
+
+
+def _profile_score(ink: Image.Image, angle: float) -> float:
+    rows = np.asarray(ink.rotate(angle, resample=Image.NEAREST, expand=True), dtype=np.float64).sum(axis=1)
+    return float(np.square(np.diff(rows)).sum())
+
+
+def estimate_skew(ink: np.ndarray, max_degrees: float) -> float:
+    """
+    Rotation in degrees (counter-clockwise, as PIL's rotate) that makes text lines horizontal.
+
+    Text lines give the sharpest horizontal projection profile when they are level, so the
+    angle maximising the row-to-row change of ink counts wins. Measured on a thumbnail.
+    """
+    step = max(1, int(np.ceil(max(ink.shape) / SKEW_THUMBNAIL)))
+    thumbnail = Image.fromarray(ink[::step, ::step].astype(np.uint8))
+
+    def best(angles):
+        return max(angles, key=lambda angle: _profile_score(thumbnail, angle))
+
+    coarse = best(np.arange(-max_degrees, max_degrees + SKEW_COARSE_STEP / 2, SKEW_COARSE_STEP))
+    fine = np.arange(coarse - SKEW_COARSE_STEP, coarse + SKEW_COARSE_STEP + SKEW_FINE_STEP / 2, SKEW_FINE_STEP)
+    return float(best(np.clip(fine, -max_degrees, max_degrees)))
+
+
+def ink_box(ink: np.ndarray, margin: int) -> Optional[Tuple[int, int, int, int]]:
+    """(left, top, right, bottom) of all ink plus `margin` pixels, or None for a blank page."""
+    rows = np.flatnonzero(ink.any(axis=1))
+    if not len(rows):
+        return None
+    columns = np.flatnonzero(ink.any(axis=0))
+    height, width = ink.shape
+    return (
+        max(0, int(columns[0]) - margin),
+        max(0, int(rows[0]) - margin),
+        min(width, int(columns[-1]) + 1 + margin),
+        min(height, int(rows[-1]) + 1 + margin),
+    )
+
+
+def line_height(ink: np.ndarray) -> int:
+    """Median height in pixels of the bands of rows that contain ink, i.e. of the text lines."""
+    rows = np.concatenate(([False], ink.any(axis=1), [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(rows))
+    heights = edges[1::2] - edges[::2]
+    return int(np.median(heights)) if len(heights) else 0
+
+
+def preprocess_image(image: Image.Image, config: OCRPreprocessConfig, source_dpi: Optional[float] = None,
+                     downscale: bool = True) -> Tuple[Optional[Image.Image], bool]:
+    """
+    Grayscale, downscale, deskew, crop and binarize an image for Tesseract.
+
+    Images known to be above target_dpi, or whose text lines are taller than
+    max_line_height, are shrunk unless downscale is False. Returns (image, downscaled),
+    with image None when the page holds no ink at all.
+    """
+    gray = image.convert("L")
+    downscaled = False
+    if downscale and source_dpi and source_dpi > config.target_dpi:
+        gray = _resize(gray, config.target_dpi / source_dpi)
+        downscaled = True
+
+    pixels = np.asarray(gray)
+    threshold = otsu_threshold(pixels)
+    ink = pixels < threshold
+    if not ink.any():
+        return None, downscaled
+
+    if config.deskew:
+        angle = estimate_skew(ink, config.max_skew_degrees)
+        if abs(angle) >= SKEW_MIN_DEGREES:
+            gray = gray.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+            pixels = np.asarray(gray)
+            ink = pixels < threshold
+
+    if config.crop_margins:
+        box = ink_box(ink, config.margin)
+        if box is None:
+            return None, downscaled
+        gray = gray.crop(box)
+        left, top, right, bottom = box
+        ink = ink[top:bottom, left:right]
+
+    height = line_height(ink)
+    if downscale and config.max_line_height and height > config.max_line_height:
+        gray = _resize(gray, config.max_line_height / height)
+        downscaled = True
+
+    if config.binarize:
+        gray = gray.point(lambda value: 0 if value < threshold else 255)
+    return gray, downscaled
+
+
+def ocr_preprocessed(image: Image.Image, config: OCRPreprocessConfig, backend: OCRBackend, lang: str,
+                     source_dpi: Optional[float] = None, downscale: bool = True) -> Tuple[str, float, bool]:
+    """(text, confidence, downscaled) for an image after preprocess_image; blank pages skip Tesseract."""
+    prepared, downscaled = preprocess_image(image, config, source_dpi, downscale)
+    if prepared is None:
+        return "", 100.0, downscaled
+    text, confidence = backend.image_to_text_and_confidence(prepared, lang)
+    return text, confidence, downscaled
@@ -0,0 +1,223 @@
+import os
+import sys
+import json
+import time
+import shutil
+import cProfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from src.logger import logging
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Set while a profiled pipeline runs; worker processes inherit it and trace into the same directory.
+TRACE_DIR_ENV = "SMARTDOC_TRACE_DIR"
+
+
+def _write_event(stage: str, name: str, ts: float, seconds: float, cpu_seconds: float, args):
+    event = {
+        "name": name, "ts": ts, "dur": seconds, "cpu": cpu_seconds,
+        "pid": os.getpid(), "tid": threading.get_ident(), "args": args,
+    }
+    with open(os.path.join(os.environ[TRACE_DIR_ENV], f"{stage}-{os.getpid()}.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps(event, default=str) + "\n")
+
+
+@contextmanager
+def trace_document(stage: str, name: str, **args):
+    """
+    Time one unit of work (a document, page or epoch) of a pipeline stage.
+
+    A no-op unless the pipeline runs with --profile. Events are appended to a JSONL file
+    per stage and process, so code running in worker processes is traced too. Pages of
+    one document pass document=<filename> so they are ranked as one document.
+    """
+    if not os.environ.get(TRACE_DIR_ENV):
+        yield
+        return
+
+    ts = time.time()
+    start = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield
+    finally:
+        _write_event(stage, name, ts, time.perf_counter() - start, time.process_time() - cpu, args)
+
+
+class TraceClock:
+    """
+    trace_document for loops whose items only become known when they arrive, e.g. documents
+    coming out of a streamed nlp.pipe: record() traces the time since the last reset().
+    """
+
+    def __init__(self):
+        self.enabled = bool(os.environ.get(TRACE_DIR_ENV))
+        self.reset()
+
+    def reset(self):
+        if self.enabled:
+            self._ts, self._start, self._cpu = time.time(), time.perf_counter(), time.process_time()
+
+    def record(self, stage: str, name: str, **args):
+        if self.enabled:
+            _write_event(stage, name, self._ts, time.perf_counter() - self._start, time.process_time() - self._cpu, args)
+
+
+def _reset_peak_rss() -> bool:
+    # Linux lets a process reset its own high-water mark (VmHWM) by writing 5 to clear_refs.
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb(resettable: bool) -> Optional[float]:
+    if resettable:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _children_peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+
+
+class PipelineProfiler:
+    """
+    Per-stage wall time, CPU time, peak RSS and documents per second, plus per-document traces.
+
+    CPU time is split into this process and its finished child processes (pool workers,
+    tesseract runs). Peak RSS is per stage for this process on Linux; for children the OS
+    only keeps the largest child seen so far.
+
+    For every stage it writes <output_dir>/<stage>.trace.json (Chrome trace event format,
+    open in chrome://tracing or Perfetto) and, with cprofile on, <stage>.prof for the main
+    process. summary.json holds the stage table and the slowest documents.
+    """
+
+    def __init__(self, output_dir: str, cprofile: bool = False, top: int = 10):
+        self.output_dir = output_dir
+        self.cprofile = cprofile
+        self.top = top
+        self.events_dir = os.path.join(output_dir, "events")
+        self.stages: List[Dict] = []
+        self.slowest: Dict[str, List[Dict]] = {}
+
+        shutil.rmtree(self.events_dir, ignore_errors=True)
+        os.makedirs(self.events_dir, exist_ok=True)
+        self._previous_trace_dir = os.environ.get(TRACE_DIR_ENV)
+        os.environ[TRACE_DIR_ENV] = os.path.abspath(self.events_dir)
+
+    def close(self):
+        if self._previous_trace_dir is None:
+            os.environ.pop(TRACE_DIR_ENV, None)
+        else:
+            os.environ[TRACE_DIR_ENV] = self._previous_trace_dir
+        shutil.rmtree(self.events_dir, ignore_errors=True)
+
+    @contextmanager
+    def stage(self, name: str):
+        resettable = _reset_peak_rss()
+        profile = cProfile.Profile() if self.cprofile else None
+        ts = time.time()
+        start = time.perf_counter()
+        cpu = time.process_time()
+        children = os.times()
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+                profile.dump_stats(os.path.join(self.output_dir, f"{name}.prof"))
+            wall = time.perf_counter() - start
+            after = os.times()
+            children_cpu = (after.children_user - children.children_user) + (after.children_system - children.children_system)
+            self._finish_stage(name, ts, wall, time.process_time() - cpu, children_cpu, _peak_rss_mb(resettable))
+
+    def _read_events(self, stage: str) -> List[Dict]:
+        events = []
+        prefix = f"{stage}-"
+        for filename in sorted(os.listdir(self.events_dir)):
+            if filename.startswith(prefix) and filename.endswith(".jsonl"):
+                with open(os.path.join(self.events_dir, filename), encoding="utf-8") as f:
+                    events.extend(json.loads(line) for line in f if line.strip())
+        return events
+
+    def _finish_stage(self, name: str, ts: float, wall: float, cpu: float, children_cpu: float, peak_rss_mb):
+        events = self._read_events(name)
+
+        # Pages and other parts of one document are traced separately but ranked together.
+        per_document = {}
+        for event in events:
+            document = event["args"].get("document", event["name"])
+            entry = per_document.setdefault(document, {"document": document, "seconds": 0.0, "cpu_seconds": 0.0, "events": 0})
+            entry["seconds"] += event["dur"]
+            entry["cpu_seconds"] += event["cpu"]
+            entry["events"] += 1
+        self.slowest[name] = sorted(per_document.values(), key=lambda d: d["seconds"], reverse=True)[:self.top]
+
+        summary = {
+            "stage": name,
+            "wall_seconds": wall,
+            "cpu_seconds": cpu,
+            "children_cpu_seconds": children_cpu,
+            "peak_rss_mb": peak_rss_mb,
+            "children_peak_rss_mb": _children_peak_rss_mb(),
+            "documents": len(per_document),
+            "documents_per_second": len(per_document) / wall if wall else 0.0,
+        }
+        self.stages.append(summary)
+        self._write_trace(name, ts, wall, events)
+        logging.info(
+            f"⏱️ Stage '{name}': {wall:.2f}s wall, {cpu:.2f}s CPU (+{children_cpu:.2f}s children), "
+            f"{summary['documents']} documents ({summary['documents_per_second']:.1f}/s), peak RSS {peak_rss_mb or 0:.0f} MB"
+        )
+
+    def _write_trace(self, name: str, ts: float, wall: float, events: List[Dict]):
+        main_pid = os.getpid()
+        trace = [{
+            "name": name, "cat": "stage", "ph": "X", "ts": ts * 1e6, "dur": wall * 1e6,
+            "pid": main_pid, "tid": 0, "args": {},
+        }]
+        for event in events:
+            trace.append({
+                "name": event["name"], "cat": name, "ph": "X", "ts": event["ts"] * 1e6, "dur": event["dur"] * 1e6,
+                "pid": event["pid"], "tid": event["tid"], "args": dict(event["args"], cpu_seconds=event["cpu"]),
+            })
+        with open(os.path.join(self.output_dir, f"{name}.trace.json"), "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+    def report(self) -> str:
+        """Write summary.json and return the stage table plus the slowest documents as text."""
+        with open(os.path.join(self.output_dir, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump({"stages": self.stages, "slowest_documents": self.slowest}, f, indent=2)
+
+        lines = [f"{'stage':10s} {'wall s':>8s} {'cpu s':>8s} {'child s':>8s} {'peak MB':>8s} {'docs':>6s} {'docs/s':>8s}"]
+        for s in self.stages:
+            lines.append(
+                f"{s['stage']:10s} {s['wall_seconds']:8.2f} {s['cpu_seconds']:8.2f} {s['children_cpu_seconds']:8.2f} "
+                f"{s['peak_rss_mb'] or 0:8.0f} {s['documents']:6d} {s['documents_per_second']:8.1f}"
+            )
+        for stage, documents in self.slowest.items():
+            if documents:
+                lines.append(f"slowest in {stage}:")
+                lines.extend(f"  {d['seconds']:8.3f}s  {d['document']}" for d in documents)
+        return "\n".join(lines)
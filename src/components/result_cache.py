@@ -0,0 +1,41 @@
+import os
+import json
+import hashlib
+from src.components.ocr_cache import OCRCache, content_hash
+from src.entity.config_entity import OCRCacheConfig
+
+
+def model_version(model_dir: str) -> str:
+    """
+    "<name>-<version>-<digest>" for a saved spaCy pipeline.
+
+    meta.json alone is not enough: retraining writes new weights under the same version
+    string, so the digest covers every file in the model directory.
+    """
+    with open(os.path.join(model_dir, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(model_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, model_dir).encode("utf-8"))
+            digest.update(content_hash(path).encode("ascii"))
+    return f"{meta.get('name', 'model')}-{meta.get('version', '0.0.0')}-{digest.hexdigest()[:12]}"
+
+
+class ResultCache(OCRCache):
+    """
+    Extraction results (text and entities) keyed by upload content and the NER model version.
+
+    The model version is part of every key, so results from a previous model are never
+    served after it changes; they simply age out of the LRU.
+    """
+
+    def __init__(self, config: OCRCacheConfig, model_dir: str):
+        super().__init__(config)
+        self.model_version = model_version(model_dir)
+
+    def make_key(self, source, **params) -> str:
+        return super().make_key(source, model=self.model_version, **params)
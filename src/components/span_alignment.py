@@ -0,0 +1,98 @@
+from typing import Iterable, List, Tuple
+import numpy as np
+from spacy.attrs import IDX, LENGTH
+from spacy.tokens import Doc
+
+Entity = Tuple[int, int, str]
+
+
+def token_bounds(doc: Doc) -> Tuple[np.ndarray, np.ndarray]:
+    """Character start and end offsets of every token, both sorted ascending."""
+    if not len(doc):
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    offsets = doc.to_array([IDX, LENGTH]).astype(np.int64)
+    return offsets[:, 0], offsets[:, 0] + offsets[:, 1]
+
+
+def find_all(text: str, value: str) -> List[int]:
+    """Start offset of every occurrence of value in text, overlapping ones included."""
+    starts = []
+    start = text.find(value)
+    while start != -1:
+        starts.append(start)
+        start = text.find(value, start + 1)
+    return starts
+
+
+def aligned_mask(bounds, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """True where [start, end) begins on a token start and finishes on a token end."""
+    token_starts, token_ends = bounds
+    if not len(token_starts):
+        return np.zeros(len(starts), dtype=bool)
+
+    i = np.minimum(np.searchsorted(token_starts, starts), len(token_starts) - 1)
+    j = np.minimum(np.searchsorted(token_ends, ends), len(token_ends) - 1)
+    return (token_starts[i] == starts) & (token_ends[j] == ends)
+
+
+def align_values(doc: Doc, values: Iterable[Tuple[str, str]]):
+    """
+    Token-aligned character spans for (value, label) pairs.
+
+    Every occurrence of a value is tried and the first one that lands on token boundaries
+    wins. Returns (entities, misaligned, missing): misaligned values occur in the text
+    but never on token boundaries, missing values do not occur at all.
+    """
+    text = doc.text
+    found, candidate_starts, candidate_owners = [], [], []
+    missing = []
+
+    for value, label in values:
+        occurrences = find_all(text, value)
+        if not occurrences:
+            missing.append((value, label))
+            continue
+        candidate_owners.extend([len(found)] * len(occurrences))
+        candidate_starts.extend(occurrences)
+        found.append((value, label))
+
+    if not found:
+        return [], [], missing
+
+    starts = np.asarray(candidate_starts, dtype=np.int64)
+    owners = np.asarray(candidate_owners, dtype=np.int64)
+    ends = starts + np.asarray([len(value) for value, _ in found], dtype=np.int64)[owners]
+    mask = aligned_mask(token_bounds(doc), starts, ends)
+
+    # Candidates are grouped by value in occurrence order, so each owner's first aligned index is its first aligned hit.
+    owners_hit, first = np.unique(owners[mask], return_index=True)
+    hits = np.flatnonzero(mask)[first]
+
+    entities = [(int(starts[k]), int(ends[k]), found[owner][1]) for owner, k in zip(owners_hit, hits)]
+    aligned = set(owners_hit.tolist())
+    misaligned = [pair for owner, pair in enumerate(found) if owner not in aligned]
+    return entities, misaligned, missing
+
+
+def resolve_overlaps(entities: List[Entity]) -> List[Entity]:
+    """
+    Drop entities that overlap an earlier kept one, preferring the earliest start and then the longest span.
+
+    A single sweep over the sorted intervals: an entity is kept when it starts at or after
+    the end of everything kept so far.
+    """
+    kept = []
+    kept_end = -1
+    for start, end, label in sorted(entities, key=lambda x: (x[0], -(x[1] - x[0]))):
+        if start >= kept_end:
+            kept.append((start, end, label))
+            kept_end = end
+    return kept
+
+
+def has_overlaps(entities: List[Entity]) -> bool:
+    if len(entities) < 2:
+        return False
+    spans = np.asarray(sorted((start, end) for start, end, _ in entities), dtype=np.int64)
+    return bool((spans[1:, 0] < np.maximum.accumulate(spans[:-1, 1])).any())
@@ -0,0 +1,119 @@
+import os
+import json
+import hashlib
+import tempfile
+from typing import Dict, Iterable, List, Optional
+from src.logger import logging
+from src.components.ocr_cache import content_hash
+
+
+def fingerprint_paths(paths: Iterable[str]) -> str:
+    """Order-independent fingerprint of a set of files (name and content)."""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(os.path.basename(path).encode("utf-8"))
+        digest.update(content_hash(path).encode("ascii"))
+    return digest.hexdigest()
+
+
+def fingerprint_dir(directory: str, suffix: str) -> str:
+    if not os.path.isdir(directory):
+        return ""
+    return fingerprint_paths(
+        os.path.join(directory, f) for f in os.listdir(directory) if f.lower().endswith(suffix)
+    )
+
+
+class StageManifest:
+    """
+    Append-only journal of what a pipeline stage has produced.
+
+    Every completed document appends one line, so a crashed run loses at most the document
+    in flight. A final "complete" line records the fingerprint of the stage's whole input
+    set, which lets a rerun skip the stage when nothing upstream changed. Records are only
+    trusted while the stage params match the ones they were written with.
+    """
+
+    def __init__(self, path: str, params: Optional[Dict] = None):
+        self.path = path
+        self.params_hash = hashlib.sha256(json.dumps(params or {}, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        self.records: Dict[str, Dict] = {}
+        self.complete: Optional[Dict] = None
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A crash mid-write leaves at most one torn trailing line.
+                    continue
+                if entry.get("params") != self.params_hash:
+                    continue
+                if "key" in entry:
+                    self.records[entry["key"]] = entry
+                    self.complete = None
+                elif "complete" in entry:
+                    self.complete = entry
+
+        logging.info(f"📒 Manifest {self.path}: {len(self.records)} recorded documents")
+
+    def _append(self, entry: Dict):
+        entry["params"] = self.params_hash
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def fingerprint(path: str) -> str:
+        return content_hash(path)
+
+    def is_current(self, key: str, fingerprint: str) -> bool:
+        record = self.records.get(key)
+        return (
+            record is not None
+            and record["fingerprint"] == fingerprint
+            and all(os.path.exists(p) for p in record["outputs"])
+        )
+
+    def record(self, key: str, fingerprint: str, outputs: List[str]):
+        entry = {"key": key, "fingerprint": fingerprint, "outputs": list(outputs)}
+        self._append(entry)
+        self.records[key] = entry
+        self.complete = None
+
+    def prune(self, keys: Iterable[str]) -> int:
+        """Forget documents whose input disappeared and delete the outputs they left behind."""
+        stale = set(self.records) - set(keys)
+        for key in stale:
+            for path in self.records.pop(key)["outputs"]:
+                if os.path.exists(path):
+                    os.remove(path)
+        if stale:
+            logging.info(f"🧽 Removed outputs of {len(stale)} deleted inputs")
+        return len(stale)
+
+    def is_complete(self, inputs_fingerprint: str) -> bool:
+        return (
+            self.complete is not None
+            and self.complete["complete"] == inputs_fingerprint
+            and all(os.path.exists(p) for p in self.complete["outputs"])
+        )
+
+    def mark_complete(self, inputs_fingerprint: str, outputs: List[str]):
+        """Compact the journal down to the live records plus a completion marker."""
+        lines = [dict(r, params=self.params_hash) for r in self.records.values()]
+        self.complete = {"complete": inputs_fingerprint, "outputs": list(outputs), "params": self.params_hash}
+        lines.append(self.complete)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for entry in lines:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
@@ -6,14 +6,20 @@ DATA_DIR = ROOT_DIR / "data"
 EXTRACTED_TEXT_DIR = ROOT_DIR / "extracted_texts"
 CLEANED_TEXT_DIR = ROOT_DIR / "cleaned_texts"
 TRAINED_MODEL_DIR = ROOT_DIR / "trained_invoice_ner"
+OCR_CACHE_DIR = ROOT_DIR / "ocr_cache"
+RESULT_CACHE_DIR = ROOT_DIR / "result_cache"
 
 
 EXTRACTED_FIELDS_JSON = ROOT_DIR / "extracted_fields_summary.json"
 NER_TRAINING_DATA_JSON = ROOT_DIR / "ner_training_data_clean.json"
+NER_CORPUS_DIR = ROOT_DIR / "ner_corpus"
 EXTRACTED_FIELDS_CSV = ROOT_DIR / "extracted_fields_summary.csv"
 TEST_PREDICTION_JSON = ROOT_DIR / "extracted_texts" / "fields.json"
 
 
+TESSERACT_CMD = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+
+
 SUPPORTED_FILE_TYPES = [".txt", ".pdf", ".docx", ".csv", ".jpg", ".jpeg", ".png"]
 
 
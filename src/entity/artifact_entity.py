@@ -1,25 +1,47 @@
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 
 
 @dataclass
 class DataExtractionArtifact:
     extracted_dir: str               
     status: str                       
+    documents_processed: int = 0
+    pages_processed: int = 0
+    pages_rejected: int = 0
+    pages_from_text_layer: int = 0
+    documents_skipped: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    elapsed_seconds: float = 0.0
+    pages_per_second: float = 0.0
+
+
+@dataclass
+class DataCleanerArtifact:
+    cleaned_dir: str
+    status: str
+    documents_processed: int = 0
+    documents_skipped: int = 0
 
 
 @dataclass
 class FieldExtractionArtifact:
     json_path: str                   
     status: str
+    csv_path: Optional[str] = None
+    records: int = 0
+    documents_processed: int = 0
+    documents_skipped: int = 0
 
 
 @dataclass
 class DataFeildGetterArtifact:
-    output_json_path: str             
+    output_corpus_path: str
     total_records: int
     misaligned: int
     status: str
+    shards: int = 0
 
 
 @dataclass
@@ -33,8 +55,9 @@ class TrainingValidatorArtifact:
 @dataclass
 class NERTrainerArtifact:
     model_path: str
-    training_loss: List[float]
+    training_loss: List[Dict[str, float]]   # per epoch: loss, seconds, words_per_second, ents_f
     status: str
+    best_score: Optional[float] = None
 
 
 @dataclass
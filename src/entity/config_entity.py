@@ -1,37 +1,121 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional
+
+
+@dataclass
+class OCRPreprocessConfig:
+    target_dpi: int = 200              # first-pass rasterization dpi; images known to be finer are downscaled to it
+    max_line_height: int = 48          # text lines taller than this many pixels are downscaled to it; 0 disables
+    min_confidence: float = 60.0       # mean word confidence below which a page is OCRed again at full resolution
+    binarize: bool = True
+    deskew: bool = True
+    max_skew_degrees: float = 5.0
+    crop_margins: bool = True
+    margin: int = 10                   # pixels of paper kept around the ink when cropping
 
 
 @dataclass
 class DataExtractionEntity:
     input_dir: str                     
     output_dir: str                     
+    dpi: int = 300
+    lang: str = "eng"
+    num_workers: int = 1               # > 1 switches to the per-page process pool
+    streaming: bool = False            # rasterize/OCR/free a window of pages at a time
+    page_window: int = 1
+    rasterize_to_disk: bool = False    # stage rasterized pages in a temp dir instead of RAM
+    max_page_pixels: int = 60_000_000  # pages larger than this at `dpi` are rejected; 0 disables
+    text_layer_first: bool = False     # OCR only pages whose native text layer is unusable
+    min_text_chars: int = 20
+    max_garbage_ratio: float = 0.3
+    cache_dir: Optional[str] = None    # content-addressed OCR cache; None disables it
+    cache_max_bytes: int = 512 * 1024 * 1024
+    preprocess: Optional[OCRPreprocessConfig] = None  # grayscale/deskew/crop/adaptive-dpi stage before OCR; None disables
+    ocr_backend: str = "pytesseract"   # "tesserocr" (persistent engines, needs tesserocr), "pytesseract" or "auto"
+
+
+@dataclass
+class HybridExtractionConfig:
+    dpi: int = 300
+    lang: str = "eng"
+    text_layer_first: bool = True
+    min_chars: int = 20                # fewer non-space chars than this means the page needs OCR
+    max_garbage_ratio: float = 0.3     # share of unmapped/control glyphs above which the layer is ignored
+    preprocess: Optional[OCRPreprocessConfig] = None
+
+
+@dataclass
+class OCRCacheConfig:
+    cache_dir: Optional[str]            # None keeps the cache in memory only
+    max_bytes: int = 512 * 1024 * 1024  # disk tier is evicted least-recently-used beyond this
+    memory_items: int = 128             # in-process tier; 0 disables it
+
+
+@dataclass
+class JobQueueConfig:
+    max_workers: int = 2                # jobs processed concurrently
+    max_pending: int = 8                # jobs allowed to wait beyond that before submissions get a 429
+    result_ttl_seconds: int = 600       # how long finished jobs stay collectable
+    store_path: Optional[str] = None    # SQLite file shared by worker processes; None keeps jobs in memory only
+
+
+@dataclass
+class NERChunkingConfig:
+    max_chars: int = 20_000             # longer texts are split into chunks of at most this many characters
+    overlap: int = 300                  # characters shared by neighbouring chunks so boundary entities are seen whole
+
+
+@dataclass
+class DataCleanerConfig:
+    input_dir: str
+    output_dir: str
+    num_workers: int = 1
 
 
 @dataclass
 class FieldExtractionEntity:
     cleaned_text_dir: str              
     output_json_path: str              
+    output_csv_path: Optional[str] = None  # flat Filename + field columns consumed by NERDataPreparer
+    output_format: str = "json"            # "json" (one array) or "jsonl" (one record per line, streamed)
+    parquet_path: Optional[str] = None     # optional columnar copy of the field columns (needs pyarrow)
+    batch_size: int = 64                   # texts per nlp.pipe batch; also the Parquet row-group size
+    n_process: int = 1                     # spaCy worker processes for nlp.pipe
+    ner_max_chars: int = 20_000            # texts longer than this go through NER in overlapping chunks
+    ner_chunk_overlap: int = 300
+    records_dir: Optional[str] = None      # one JSON record per document, reused for unchanged texts (with a manifest)
+    model: str = "en_core_web_sm"          # spaCy pipeline used for the entity fields
 
 
 @dataclass
 class DataFeildGetterEntity:
     csv_file: str                      
     text_dir: str                     
-    output_json: str                  
+    output_corpus: str                 # directory of DocBin (.spacy) shards
+    shard_size: int = 250              # CSV rows per shard; also the unit of work per process
+    num_workers: int = 1
 
 
 @dataclass
 class TrainingDataValidatorConfig:
     input_json: str                    
-    output_clean_json: str           
+    output_corpus: str                 # directory of DocBin (.spacy) shards
+    shard_size: int = 1000
 
 
 @dataclass
 class NERTrainerConfig:
-    training_data_path: str          
+    training_data_path: str          # DocBin corpus (.spacy file or shard directory) or field records JSON/JSONL
     model_output_dir: str            
     num_iterations: int = 30          
+    dropout: float = 0.3
+    label_mapping: Optional[Dict[str, str]] = None  # field name -> NER label; defaults to FIELD_LABELS
+    batch_start: float = 4.0         # compounding minibatch size: start, stop, growth factor per batch
+    batch_stop: float = 32.0
+    batch_compound: float = 1.001
+    eval_split: float = 0.1          # share of samples held out to score each epoch
+    patience: int = 5                # epochs without a better held-out score before stopping
+    seed: int = 0
 
 
 @dataclass
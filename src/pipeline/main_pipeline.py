@@ -1,6 +1,12 @@
 import os
+import sys
+import shutil
+import hashlib
+from contextlib import nullcontext
+from dataclasses import asdict
 from src.logger import logging
-from src.exception import CustomException
+from src.exception import MyException
+from src.constants import OCR_CACHE_DIR
 
 
 from src.components.data_Extraction import DataExtractor
@@ -8,72 +14,147 @@ from src.components.data_cleaner import DataCleaner
 from src.components.data_feild_extraction import FieldExtractor
 from src.components.data_prepare import NERDataPreparer
 from src.components.data_trainer import NERTrainer
+from src.components.profiling import PipelineProfiler
+from src.components.stage_manifest import StageManifest, fingerprint_dir, fingerprint_paths
 
 
 
 from src.entity.config_entity import (
     DataExtractionEntity,
+    OCRPreprocessConfig,
+    DataCleanerConfig,
     FieldExtractionEntity,
     DataFeildGetterEntity,
-    NERTrainerConfig,
-    NERPredictorConfig
+    NERTrainerConfig
 )
 
 
-def run_pipeline():
+MANIFEST_DIR = os.path.join("artifacts", "manifests")
+
+# Knobs that change how fast a stage runs but not what it writes.
+RUNTIME_FIELDS = (
+    "num_workers", "streaming", "page_window", "rasterize_to_disk", "cache_dir", "cache_max_bytes",
+    "batch_size", "n_process", "ocr_backend"
+)
+
+
+def _params(config) -> dict:
+    return {k: v for k, v in asdict(config).items() if k not in RUNTIME_FIELDS}
+
+
+def _manifest(stage: str, params=None) -> StageManifest:
+    return StageManifest(os.path.join(MANIFEST_DIR, f"{stage}.jsonl"), params)
+
+
+def _combine(*fingerprints) -> str:
+    return hashlib.sha256("|".join(fingerprints).encode("utf-8")).hexdigest()
+
+
+def _run_stage(stage: str, inputs_fingerprint: str, outputs, params, run, manifest: StageManifest = None):
+    """
+    Run a whole-corpus stage unless its manifest says the same inputs already produced `outputs`.
+
+    A stage that journals its documents itself passes its own manifest, so the completion
+    marker is written to the same journal instead of over it.
+    """
+    manifest = manifest or _manifest(stage, params)
+    if manifest.is_complete(inputs_fingerprint):
+        logging.info(f"⏭️ Stage '{stage}' is up to date, skipping")
+        return None
+
+    artifact = run()
+    manifest.mark_complete(inputs_fingerprint, outputs)
+    return artifact
+
+
+def run_pipeline(force: bool = False, profiler: PipelineProfiler = None):
+    """Run every stage; with a profiler, each stage is timed and traced (see run_pipeline.py --profile)."""
+    def stage(name: str):
+        return profiler.stage(name) if profiler else nullcontext()
+
     try:
         logging.info("🚀 Starting SmartDoc-Extractor Pipeline...")
+        if force:
+            shutil.rmtree(MANIFEST_DIR, ignore_errors=True)
+            logging.info("🔁 Forced run: stage manifests cleared")
+
 
-        
         extraction_config = DataExtractionEntity(
             input_dir="data",
-            output_dir="artifacts/extracted_texts"
+            output_dir="artifacts/extracted_texts",
+            num_workers=os.cpu_count() or 1,
+            text_layer_first=True,
+            cache_dir=str(OCR_CACHE_DIR),
+            preprocess=OCRPreprocessConfig(),
+            ocr_backend="auto"
         )
-        extractor = DataExtractor(config=extraction_config)
-        extraction_artifact = extractor.extract_text_from_pdfs()
+        extractor = DataExtractor(config=extraction_config, manifest=_manifest("extract", _params(extraction_config)))
+        with stage("extract"):
+            extraction_artifact = extractor.extract_text_from_pdfs()
+
+
+        cleaner_config = DataCleanerConfig(
+            input_dir=extraction_artifact.extracted_dir,
+            output_dir="artifacts/cleaned_texts",
+            num_workers=os.cpu_count() or 1
+        )
+        cleaner = DataCleaner(config=cleaner_config, manifest=_manifest("clean"))
+        with stage("clean"):
+            cleaner_artifact = cleaner.clean_all_texts()
+        cleaned_fingerprint = fingerprint_dir(cleaner_artifact.cleaned_dir, ".txt")
 
-        
-        cleaner = DataCleaner(extraction_artifact)
-        cleaner.clean()  
 
-        
         field_config = FieldExtractionEntity(
-            cleaned_text_dir=extraction_artifact.extracted_dir,
-            output_json_path="artifacts/extracted_fields_summary.json"
+            cleaned_text_dir=cleaner_artifact.cleaned_dir,
+            output_json_path="artifacts/extracted_fields_summary.jsonl",
+            output_format="jsonl",
+            output_csv_path="artifacts/extracted_fields_summary.csv",
+            records_dir="artifacts/field_records",
+            n_process=os.cpu_count() or 1
         )
-        field_extractor = FieldExtractor(config=field_config)
-        field_artifact = field_extractor.extract_fields_from_texts()
+        # Fields are journaled per document: a changed text reruns NER for that text only.
+        # Prepare and train build one corpus and one model from all records, so they stay all-or-nothing.
+        field_manifest = _manifest("fields", _params(field_config))
+        with stage("fields"):
+            _run_stage(
+                "fields", cleaned_fingerprint,
+                [field_config.output_json_path, field_config.output_csv_path], _params(field_config),
+                lambda: FieldExtractor(config=field_config, manifest=field_manifest).extract_fields_from_all(),
+                manifest=field_manifest
+            )
+
 
-        
         train_data_config = DataFeildGetterEntity(
-            csv_file="artifacts/extracted_fields_summary.csv",
-            text_dir=extraction_artifact.extracted_dir,
-            output_json="artifacts/ner_training_data_clean.json"
+            csv_file=field_config.output_csv_path,
+            text_dir=cleaner_artifact.cleaned_dir,
+            output_corpus="artifacts/ner_corpus",
+            num_workers=os.cpu_count() or 1
         )
-        data_preparer = NERDataPreparer(config=train_data_config)
-        training_artifact = data_preparer.generate_clean_training_data()
+        with stage("prepare"):
+            _run_stage(
+                "prepare", _combine(fingerprint_paths([train_data_config.csv_file]), cleaned_fingerprint),
+                [train_data_config.output_corpus], _params(train_data_config),
+                lambda: NERDataPreparer(config=train_data_config).generate_training_data()
+            )
+
 
-        
         trainer_config = NERTrainerConfig(
-            training_data_path=training_artifact.output_json_path,
+            training_data_path=train_data_config.output_corpus,
             model_output_dir="artifacts/trained_invoice_ner",
             num_iterations=30
         )
-        trainer = NERTrainer(config=trainer_config)
-        trainer_artifact = trainer.train_model()
-
-        
-        predictor_config = NERPredictorConfig(
-            model_path=trainer_artifact.model_path
-        )
-        predictor = NERPredictor(config=predictor_config)
-        predictor.predict_on_sample()
+        with stage("train"):
+            _run_stage(
+                "train", fingerprint_dir(trainer_config.training_data_path, ".spacy"),
+                [trainer_config.model_output_dir], _params(trainer_config),
+                lambda: NERTrainer(config=trainer_config).train_and_save()
+            )
 
         logging.info("✅ SmartDoc-Extractor Pipeline Execution Complete!")
 
     except Exception as e:
         logging.error("❌ Pipeline failed!", exc_info=True)
-        raise CustomException(e)
+        raise MyException(e, sys)
 
 
 
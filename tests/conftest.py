@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# The app and pipeline resolve fonts, the model and logs/ relative to the repository root.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+# Importing app must not touch the shared job store or the on-disk result cache.
+os.environ.setdefault("SMARTDOC_JOB_DB", os.path.join(tempfile.mkdtemp(prefix="smartdoc_test_jobs_"), "jobs.sqlite"))
+os.environ.setdefault("SMARTDOC_RESULT_CACHE_DIR", "")
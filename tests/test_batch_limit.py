@@ -0,0 +1,74 @@
+import io
+import json
+import zipfile
+
+import app as smartdoc
+
+
+def zip_of(count):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for i in range(count):
+            archive.writestr(f"doc{i}.txt", f"Invoice {i} from Acme Corp")
+        archive.writestr("__MACOSX/._doc0.txt", "")
+    buffer.seek(0)
+    return buffer
+
+
+def post_zip(client, count):
+    data = {"files": (zip_of(count), "batch.zip", "application/zip")}
+    return client.post("/extract/batch", data=data, content_type="multipart/form-data")
+
+
+def test_batch_above_the_cap_is_refused(monkeypatch):
+    monkeypatch.setattr(smartdoc, "MAX_BATCH_DOCUMENTS", 3)
+    client = smartdoc.app.test_client()
+
+    with post_zip(client, 4) as response:
+        assert response.status_code == 413
+
+    with post_zip(client, 3) as response:
+        assert response.status_code == 200
+        assert len(response.get_data(as_text=True).splitlines()) == 3
+
+
+def test_concurrent_batch_gets_429():
+    client = smartdoc.app.test_client()
+    assert smartdoc.batch_slots.acquire(blocking=False)
+    try:
+        with post_zip(client, 1) as response:
+            assert response.status_code == 429
+            assert response.headers["Retry-After"] == "5"
+    finally:
+        smartdoc.batch_slots.release()
+    # Closing a response frees its slot.
+    for _ in range(2):
+        with post_zip(client, 1) as response:
+            assert response.status_code == 200
+
+
+def test_corrupt_zip_is_one_error_record():
+    client = smartdoc.app.test_client()
+    data = {"files": [
+        (io.BytesIO(b"not an archive"), "b.zip", "application/zip"),
+        (io.BytesIO(b"Invoice 7 from Acme Corp"), "a.txt", "text/plain"),
+    ]}
+    with client.post("/extract/batch", data=data, content_type="multipart/form-data") as response:
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [r["filename"] for r in records] == ["b.zip", "a.txt"]
+    assert "error" in records[0] and "error" not in records[1]
+
+
+def test_member_limit_applies_to_unpacked_bytes(monkeypatch):
+    monkeypatch.setattr(smartdoc, "MAX_UPLOAD_BYTES", 1000)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("big.txt", "a" * 5000)
+        archive.writestr("small.txt", "Invoice 1")
+    buffer.seek(0)
+    client = smartdoc.app.test_client()
+    data = {"files": (buffer, "batch.zip", "application/zip")}
+    with client.post("/extract/batch", data=data, content_type="multipart/form-data") as response:
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert "upload limit" in records[0]["error"]
+    assert "error" not in records[1]
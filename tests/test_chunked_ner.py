@@ -0,0 +1,54 @@
+import spacy
+import pytest
+from src.components.chunked_ner import chunked_entities, iter_document_entities, split_chunks
+from src.entity.config_entity import NERChunkingConfig
+
+CONFIG = NERChunkingConfig(max_chars=200, overlap=60)
+
+
+@pytest.fixture(scope="module")
+def nlp():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("entity_ruler").add_patterns([
+        {"label": "ORG", "pattern": "Acme Corp"},
+        {"label": "ORG", "pattern": "Globex International Holdings"},
+        {"label": "GPE", "pattern": "New York"},
+    ])
+    return nlp
+
+
+def full_entities(nlp, text):
+    return sorted((ent.start_char, ent.end_char, ent.label_) for ent in nlp(text).ents)
+
+
+def document(count):
+    names = ["Acme Corp", "Globex International Holdings", "New York"]
+    return " ".join(f"item {i} shipped by {names[i % 3]} on time" for i in range(count))
+
+
+def test_chunked_entities_match_the_whole_document(nlp):
+    text = document(60)
+    chunks = split_chunks(text, CONFIG.max_chars, CONFIG.overlap)
+    expected = full_entities(nlp, text)
+    assert len(chunks) > 5
+
+    # The cuts fall on whitespace, so some land inside multi-word entities and others
+    # leave an entity whole in both chunks of an overlap.
+    cut_inside = [e for e in expected for _, end in chunks[:-1] if e[0] < end < e[1]]
+    in_overlap = [
+        e for e in expected for (_, end), (start, _) in zip(chunks, chunks[1:]) if start <= e[0] and e[1] <= end
+    ]
+    assert cut_inside and in_overlap
+
+    entities = chunked_entities(nlp, text, CONFIG)
+    assert sorted(entities) == expected
+    assert all(text[start:end] in ("Acme Corp", "Globex International Holdings", "New York") for start, end, _ in entities)
+
+
+def test_documents_keep_their_own_offsets_in_a_shared_stream(nlp):
+    texts = [document(3), document(40), document(1), document(25)]
+    results = list(iter_document_entities(nlp, [(text, i) for i, text in enumerate(texts)], CONFIG, batch_size=4))
+
+    assert [context for _, context, _ in results] == [0, 1, 2, 3]
+    for text, _, entities in results:
+        assert sorted(entities) == full_entities(nlp, text)
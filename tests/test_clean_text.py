@@ -0,0 +1,35 @@
+import os
+import pytest
+from benchmarks.clean_text import SYNTHETIC, legacy_clean_text
+from src.constants import EXTRACTED_TEXT_DIR
+from src.components.data_cleaner import clean_text
+
+CORPUS_SIZE = 200
+
+EDGE_CASES = SYNTHETIC + [
+    " ",
+    " \t\n\r\n\x0b\x0c ",
+    "\n\n\n",
+    "Ünïcödé ÀÉÎÕÜ ß ç ñ",
+    "日本語の請求書 番号 – 42",
+    "مرحبا – فاتورة",
+    "é combining,  nbsp,  thin space",
+    "line one -\n\nline two - three",
+]
+
+
+def corpus():
+    names = sorted(f for f in os.listdir(EXTRACTED_TEXT_DIR) if f.endswith(".txt"))[:CORPUS_SIZE]
+    for name in names:
+        with open(os.path.join(EXTRACTED_TEXT_DIR, name), encoding="utf-8") as f:
+            yield f.read()
+
+
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_matches_legacy_cleaner_on_edge_cases(text):
+    assert clean_text(text) == legacy_clean_text(text)
+
+
+def test_matches_legacy_cleaner_on_corpus():
+    mismatches = [text[:60] for text in corpus() if clean_text(text) != legacy_clean_text(text)]
+    assert not mismatches
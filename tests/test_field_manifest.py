@@ -0,0 +1,62 @@
+import spacy
+import pytest
+from src.components.data_feild_extraction import FieldExtractor, iter_field_records
+from src.components.stage_manifest import StageManifest
+from src.entity.config_entity import FieldExtractionEntity
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    nlp = spacy.blank("en")
+    nlp.add_pipe("entity_ruler").add_patterns([{"label": "ORG", "pattern": "Acme Corp"}])
+    path = tmp_path / "model"
+    nlp.to_disk(path)
+    return str(path)
+
+
+@pytest.fixture
+def cleaned_dir(tmp_path):
+    path = tmp_path / "cleaned"
+    path.mkdir()
+    for i in range(4):
+        (path / f"doc{i}.txt").write_text(f"Acme Corp\nInvoice No: INV-{i}\nTotal: {i}00.00", encoding="utf-8")
+    return path
+
+
+def extractor(tmp_path, cleaned_dir, model_dir):
+    config = FieldExtractionEntity(
+        cleaned_text_dir=str(cleaned_dir), output_json_path=str(tmp_path / "fields.jsonl"), output_format="jsonl",
+        output_csv_path=str(tmp_path / "fields.csv"), records_dir=str(tmp_path / "records"), model=model_dir
+    )
+    return FieldExtractor(config, manifest=StageManifest(str(tmp_path / "fields.manifest.jsonl")))
+
+
+def records(tmp_path):
+    return list(iter_field_records(str(tmp_path / "fields.jsonl")))
+
+
+def test_only_changed_documents_are_extracted_again(tmp_path, cleaned_dir, model_dir):
+    artifact = extractor(tmp_path, cleaned_dir, model_dir).extract_fields_from_all()
+    assert (artifact.documents_processed, artifact.documents_skipped) == (4, 0)
+    first = records(tmp_path)
+
+    (cleaned_dir / "doc2.txt").write_text("Acme Corp\nInvoice No: INV-X\nTotal: 9.00", encoding="utf-8")
+    (cleaned_dir / "doc3.txt").unlink()
+    artifact = extractor(tmp_path, cleaned_dir, model_dir).extract_fields_from_all()
+
+    assert (artifact.documents_processed, artifact.documents_skipped) == (1, 2)
+    second = records(tmp_path)
+    assert [r["Filename"] for r in second] == ["doc0.txt", "doc1.txt", "doc2.txt"]
+    assert second[:2] == first[:2]
+    assert second[2]["Invoice Number"] == "INV-X" and second[2]["Organizations"] == "Acme Corp"
+
+
+def test_interrupted_run_resumes_after_last_finished_document(tmp_path, cleaned_dir, model_dir):
+    fields = extractor(tmp_path, cleaned_dir, model_dir)._iter_field_records()
+    next(fields)
+    next(fields)
+    fields.close()
+
+    artifact = extractor(tmp_path, cleaned_dir, model_dir).extract_fields_from_all()
+    assert (artifact.documents_processed, artifact.documents_skipped) == (2, 2)
+    assert [r["Invoice Number"] for r in records(tmp_path)] == ["INV-0", "INV-1", "INV-2", "INV-3"]
@@ -0,0 +1,36 @@
+import os
+import pytest
+from benchmarks.field_regex import legacy_match_fields
+from src.constants import CLEANED_TEXT_DIR
+from src.components.data_feild_extraction import match_fields
+
+EDGE_CASES = [
+    "",
+    "no labels here at all",
+    "INVOICE NO: INV-001\ninvoice date: 01/02/2024\nTotal Amount: $1,200.00\nTotal: 99",
+    "Invoice No - missing colon\nInvoice No: A/7",
+    "E-Way Bill No: EW-1\nE Way Bill No: EW-2\nEWay Bill No: EW-3\nEway Bill Number: EW-4",
+    "Amount Due: 50.00\nBalance Due: 20.00\nTax: 5\nGST: 3\nGSTIN: 27ABCDE1234F1Z5",
+    "Bill To: Acme\nShip To: Dock 4\nFrom: Globex\nTerms: Net 30\nPayment Terms: Net 45",
+    "Email: billing@example.com\nPhone: +91 98765 43210\nPAN: ABCDE1234F",
+    "Invo\u0130ce No: X-1\nTotal: 5",  # İ lower-cases to two characters
+    "\u212aVAT No: K1\nVAT No: V2",  # the Kelvin sign folds onto k under re.I
+    "Stra\u00dfe Total: 10\nRemarks: \u017fpecial",  # ſ folds onto s
+    "Currency: INR Curr: USD Currency: EUR",
+]
+
+
+def corpus():
+    for name in sorted(f for f in os.listdir(CLEANED_TEXT_DIR) if f.endswith(".txt")):
+        with open(os.path.join(CLEANED_TEXT_DIR, name), encoding="utf-8") as f:
+            yield name, f.read()
+
+
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_matches_legacy_patterns_on_edge_cases(text):
+    assert match_fields(text) == legacy_match_fields(text)
+
+
+def test_matches_legacy_patterns_on_sample_texts():
+    mismatches = [name for name, text in corpus() if match_fields(text) != legacy_match_fields(text)]
+    assert not mismatches
@@ -0,0 +1,15 @@
+import app as smartdoc
+
+
+def test_health_is_unready_until_warmup_has_run():
+    client = smartdoc.app.test_client()
+    assert smartdoc.ready.wait(60)
+    assert client.get("/health").status_code == 200
+
+    smartdoc.ready.clear()
+    try:
+        assert client.get("/health").status_code == 503
+        smartdoc.run_warmup()
+        assert client.get("/health").status_code == 200
+    finally:
+        smartdoc.ready.set()
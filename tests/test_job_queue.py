@@ -0,0 +1,44 @@
+import os
+import sqlite3
+import subprocess
+import sys
+from src.components.job_queue import FAILED, ORPHANED_ERROR, RUNNING, JobQueue
+from src.entity.config_entity import JobQueueConfig
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_jobs_of_exited_processes_are_failed_on_startup(tmp_path):
+    store = str(tmp_path / "jobs.sqlite")
+    JobQueue(JobQueueConfig(store_path=store)).shutdown()
+    with sqlite3.connect(store) as db:
+        db.execute("INSERT INTO jobs VALUES ('orphan', ?, 1.0, 2.0, NULL, 'null', NULL, ?)", (RUNNING, dead_pid()))
+        db.execute("INSERT INTO jobs VALUES ('alive', ?, 1.0, 2.0, NULL, 'null', NULL, ?)", (RUNNING, os.getppid()))
+
+    queue = JobQueue(JobQueueConfig(store_path=store))
+    orphan, alive = queue.get("orphan"), queue.get("alive")
+    queue.shutdown()
+
+    assert orphan.status == FAILED and orphan.error == ORPHANED_ERROR and orphan.done.is_set()
+    assert alive.status == RUNNING
+
+
+def test_store_without_pid_column_is_migrated(tmp_path):
+    store = str(tmp_path / "jobs.sqlite")
+    with sqlite3.connect(store) as db:
+        db.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, status TEXT, submitted_at REAL, "
+            "started_at REAL, finished_at REAL, result TEXT, error TEXT)"
+        )
+        db.execute("INSERT INTO jobs VALUES ('old', ?, 1.0, 2.0, NULL, 'null', NULL)", (RUNNING,))
+
+    queue = JobQueue(JobQueueConfig(store_path=store))
+    job = queue.submit(lambda: 42)
+    job.done.wait(5)
+    assert queue.get(job.id).result == 42
+    assert queue.get("old").status == FAILED
+    queue.shutdown()
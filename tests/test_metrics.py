@@ -0,0 +1,16 @@
+import json
+from src.components.metrics import MetricsRegistry
+
+
+def test_stray_files_in_shared_dir_are_ignored(tmp_path):
+    registry = MetricsRegistry(str(tmp_path))
+    requests = registry.counter("requests_total", "Requests")
+    requests.inc()
+
+    peer = MetricsRegistry(str(tmp_path / "peer"))
+    peer.counter("requests_total", "Requests").inc(2)
+    (tmp_path / "999999999.json").write_text(json.dumps(peer.snapshot()), encoding="utf-8")
+    (tmp_path / "backup.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "123.json").write_text("{not json", encoding="utf-8")
+
+    assert "requests_total 3" in registry.render()
@@ -0,0 +1,92 @@
+import json
+import pytest
+from src.components.data_trainer import NERTrainer
+from src.entity.config_entity import NERTrainerConfig
+
+
+@pytest.fixture
+def records_path(tmp_path):
+    path = tmp_path / "fields.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(10):
+            number = f"INV-{i:03d}"
+            f.write(json.dumps({"Text": f"Tax invoice\nInvoice Number: {number}\nTotal 100.00", "Invoice Number": number}) + "\n")
+    return str(path)
+
+
+def train(records_path, tmp_path, scores, patience):
+    """Train with held-out F-scores scripted per epoch; returns (artifact, epochs at which the model was saved)."""
+    trainer = NERTrainer(NERTrainerConfig(
+        training_data_path=records_path, model_output_dir=str(tmp_path / "model"),
+        num_iterations=len(scores), eval_split=0.2, patience=patience
+    ))
+    scores = iter(scores)
+    evaluated, saved = [], []
+
+    def evaluate(examples):
+        evaluated.append(len(evaluated) + 1)
+        return {"ents_f": next(scores)}
+
+    trainer.nlp.evaluate = evaluate
+    trainer.nlp.to_disk = lambda path: saved.append(len(evaluated))
+    return trainer.train_and_save(), saved
+
+
+def test_stops_after_patience_and_keeps_best_epoch(records_path, tmp_path):
+    artifact, saved = train(records_path, tmp_path, [0.2, 0.5, 0.4, 0.4, 0.4, 0.9], patience=2)
+
+    assert len(artifact.training_loss) == 4
+    assert artifact.best_score == 0.5
+    assert saved == [1, 2]
+
+
+def test_zero_scores_stop_early_and_save_final_model(records_path, tmp_path):
+    artifact, saved = train(records_path, tmp_path, [0.0] * 10, patience=3)
+
+    assert len(artifact.training_loss) == 4
+    assert artifact.best_score == 0.0
+    # Epoch 1 is saved as the first best, then the last epoch since no epoch beat 0.
+    assert saved == [1, 4]
+
+
+@pytest.fixture
+def corpus_dir(tmp_path):
+    import spacy
+    from src.components.docbin_corpus import DocBinShardWriter
+
+    nlp = spacy.blank("en")
+    path = tmp_path / "corpus"
+    with DocBinShardWriter(str(path), shard_size=7) as writer:
+        for i in range(40):
+            doc = nlp.make_doc(f"Invoice Number: INV-{i:03d} total {i}.00")
+            doc.ents = [doc.char_span(16, 23, label="INVOICE_NUMBER")]
+            writer.add(doc)
+    return str(path)
+
+
+def test_docbin_corpus_streams_each_training_example_once_per_epoch(corpus_dir, tmp_path):
+    import random
+
+    trainer = NERTrainer(NERTrainerConfig(training_data_path=corpus_dir, model_output_dir=str(tmp_path / "model"), eval_split=0.2))
+    epoch_examples, eval_examples, labels, train_count, _ = trainer.training_set()
+
+    held_out = {example.reference.text for example in eval_examples}
+    assert labels == {"INVOICE_NUMBER"}
+    assert 0 < len(held_out) < 40 and train_count == 40 - len(held_out)
+
+    rng = random.Random(0)
+    first = [example.reference.text for example in epoch_examples(rng)]
+    second = [example.reference.text for example in epoch_examples(rng)]
+    assert len(first) == train_count and set(first) == set(second)
+    assert not held_out & set(first)
+    assert first != second
+
+
+def test_trains_from_docbin_corpus(corpus_dir, tmp_path):
+    output_dir = tmp_path / "model"
+    artifact = NERTrainer(NERTrainerConfig(
+        training_data_path=corpus_dir, model_output_dir=str(output_dir), num_iterations=2
+    )).train_and_save()
+
+    assert len(artifact.training_loss) == 2
+    assert (output_dir / "meta.json").exists()
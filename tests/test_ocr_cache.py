@@ -0,0 +1,43 @@
+import io
+from src.components.ocr_cache import OCRCache
+from src.entity.config_entity import OCRCacheConfig
+
+PAGES = ["page one " * 10]
+ENTRY_BYTES = len('["' + PAGES[0] + '"]')
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = OCRCache(OCRCacheConfig(cache_dir=str(tmp_path), max_bytes=3 * ENTRY_BYTES, memory_items=0))
+    for key in "abc":
+        cache.put(key, PAGES)
+    assert cache.get("a") == PAGES  # a is now the most recently used
+
+    cache.put("d", PAGES)
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == [PAGES] * 3
+    assert sorted(p.name for p in tmp_path.glob("*.json")) == ["a.json", "c.json", "d.json"]
+    assert cache.stats()["bytes"] <= 3 * ENTRY_BYTES
+
+
+def test_memory_tier_keeps_memory_items(tmp_path):
+    cache = OCRCache(OCRCacheConfig(cache_dir=None, memory_items=2))
+    for key in "abc":
+        cache.put(key, [key])
+    assert cache.get("a") is None
+    assert cache.get("b") == ["b"] and cache.get("c") == ["c"]
+    assert cache.stats()["memory_entries"] == 2
+
+
+def test_key_changes_with_content_and_ocr_settings():
+    cache = OCRCache(OCRCacheConfig(cache_dir=None))
+    key = cache.make_key(io.BytesIO(b"scan"), kind="pdf", dpi=300, lang="eng")
+    cache.put(key, PAGES)
+
+    assert cache.make_key(io.BytesIO(b"scan"), kind="pdf", dpi=300, lang="eng") == key
+    for changed in (
+        cache.make_key(io.BytesIO(b"other scan"), kind="pdf", dpi=300, lang="eng"),
+        cache.make_key(io.BytesIO(b"scan"), kind="pdf", dpi=200, lang="eng"),
+        cache.make_key(io.BytesIO(b"scan"), kind="pdf", dpi=300, lang="deu"),
+    ):
+        assert changed != key
+        assert cache.get(changed) is None
@@ -0,0 +1,23 @@
+import re
+import app as smartdoc
+
+CREATION_DATE = re.compile(rb"/CreationDate \(D:\d+\)")
+
+
+def _render(content, entities):
+    return CREATION_DATE.sub(b"", smartdoc.render_report(content, entities))
+
+
+def test_reports_with_cached_font_match_fresh_font_load():
+    entities = [{"label": "INVOICE_NO", "text": "INV-42"}]
+    smartdoc._font_cache.clear()
+    first = _render("Invoice INV-42 total 100.00", entities)
+
+    # Glyphs only the second report uses must not be lost or leak between reports through the cache.
+    second = _render("Überweisung – Ω ₹ 5 000", [])
+    smartdoc._font_cache.clear()
+    second_fresh = _render("Überweisung – Ω ₹ 5 000", [])
+
+    assert first.startswith(b"%PDF")
+    assert second == second_fresh
+    assert first != second
@@ -0,0 +1,57 @@
+import io
+import json
+import pytest
+from src.components.result_cache import ResultCache
+from src.entity.config_entity import OCRCacheConfig
+
+RESULT = {"text": "Invoice No: 7", "entities": [{"text": "7", "label": "INVOICE_NUMBER"}]}
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    path = tmp_path / "model"
+    (path / "ner").mkdir(parents=True)
+    (path / "meta.json").write_text(json.dumps({"name": "invoice_ner", "version": "1.0.0"}), encoding="utf-8")
+    (path / "ner" / "model").write_bytes(b"weights v1")
+    return path
+
+
+def test_retrained_model_misses_the_cache(tmp_path, model_dir):
+    config = OCRCacheConfig(cache_dir=str(tmp_path / "results"))
+    cache = ResultCache(config, str(model_dir))
+    key = cache.make_key(io.BytesIO(b"upload"), mime_type="application/pdf")
+    cache.put(key, RESULT)
+    assert ResultCache(config, str(model_dir)).get(key) == RESULT
+
+    # Same name and version in meta.json, new weights.
+    (model_dir / "ner" / "model").write_bytes(b"weights v2")
+    retrained = ResultCache(config, str(model_dir))
+    assert retrained.model_version != cache.model_version
+    assert retrained.model_version.startswith("invoice_ner-1.0.0-")
+
+    new_key = retrained.make_key(io.BytesIO(b"upload"), mime_type="application/pdf")
+    assert new_key != key
+    assert retrained.get(new_key) is None
+
+
+def test_key_changes_with_extraction_settings(model_dir):
+    cache = ResultCache(OCRCacheConfig(cache_dir=None), str(model_dir))
+    key = cache.make_key(io.BytesIO(b"upload"), mime_type="application/pdf", max_chars=20_000)
+    cache.put(key, RESULT)
+
+    assert cache.make_key(io.BytesIO(b"upload"), mime_type="application/pdf", max_chars=20_000) == key
+    other = cache.make_key(io.BytesIO(b"upload"), mime_type="application/pdf", max_chars=5_000)
+    assert other != key and cache.get(other) is None
+
+
+def test_results_are_evicted_least_recently_used(tmp_path, model_dir):
+    size = len(json.dumps(RESULT, ensure_ascii=False).encode("utf-8"))
+    cache = ResultCache(OCRCacheConfig(cache_dir=str(tmp_path / "results"), max_bytes=2 * size, memory_items=1), str(model_dir))
+    keys = [cache.make_key(io.BytesIO(f"upload {i}".encode()), mime_type="text/plain") for i in range(3)]
+    for key in keys:
+        cache.put(key, RESULT)
+
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[1]) == RESULT and cache.get(keys[2]) == RESULT
+    assert cache.stats()["entries"] == 2 and cache.stats()["memory_entries"] == 1
+